@@ -0,0 +1,75 @@
+from collections import deque
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class AhoCorasick:
+    def __init__(self, patterns):
+        """
+        Automaton that finds all the occurrences of a set of patterns in a text with a single pass over the text
+        Parameters
+        ----------
+        patterns : list
+            list of non-empty strings
+        """
+        self.patterns = list(patterns)
+        # For every state: the transitions, the failure link and the
+        # patterns that end in the state
+        self.transitions = [{}]
+        self.failure = [0]
+        self.outputs = [[]]
+        for pattern_id in range(len(self.patterns)):
+            state = 0
+            for character in self.patterns[pattern_id]:
+                if character not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.failure.append(0)
+                    self.outputs.append([])
+                    self.transitions[state][character] = len(self.transitions) - 1
+                state = self.transitions[state][character]
+            self.outputs[state].append(pattern_id)
+        self.build_failure_links()
+
+    def build_failure_links(self):
+        queue = deque(self.transitions[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            for character, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                failure = self.failure[state]
+                while failure != 0 and character not in self.transitions[failure]:
+                    failure = self.failure[failure]
+                if character in self.transitions[failure] and self.transitions[failure][character] != next_state:
+                    self.failure[next_state] = self.transitions[failure][character]
+                else:
+                    self.failure[next_state] = 0
+                self.outputs[next_state] = self.outputs[next_state] + \
+                    self.outputs[self.failure[next_state]]
+
+    def step(self, state, character):
+        while state != 0 and character not in self.transitions[state]:
+            state = self.failure[state]
+        return self.transitions[state].get(character, 0)
+
+    def iter_matches(self, text):
+        """
+        Generator that yields the tuples (start, end, pattern_id) for every occurrence of a pattern in the text,
+        text[start:end] being equal to the pattern
+        """
+        state = 0
+        for i in range(len(text)):
+            state = self.step(state, text[i])
+            for pattern_id in self.outputs[state]:
+                yield i + 1 - len(self.patterns[pattern_id]), i + 1, pattern_id
+
+    def contains_any(self, text):
+        """
+        Returns True if at least one of the patterns is contained by the text
+        """
+        state = 0
+        for character in text:
+            state = self.step(state, character)
+            if len(self.outputs[state]) > 0:
+                return True
+        return False
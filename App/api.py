@@ -2,7 +2,8 @@ import os
 import time
 from flask import request, render_template, Flask
 
-from main import plot_dispatcher
+from main import plot_dispatcher, USE_QUANTIZED_MODEL, INFERENCE_SERVICE_ADDRESS
+from ModelRegistry import SHARED_MODEL_REGISTRY
 from PIL import Image
 from flask import session
 
@@ -16,6 +17,14 @@ warnings.filterwarnings("ignore")
 
 app = Flask(__name__, template_folder='templates')
 app.config["DEBUG"] = True
+# Loading the model when the worker starts, so that the first request does
+# not pay for it; if False, the model is loaded by the first request. The
+# workers that send the tweets to an InferenceService do not load it, and
+# neither do the preprocessing worker processes, which import this module
+# as __mp_main__
+PRELOAD_MODEL = True
+if PRELOAD_MODEL and INFERENCE_SERVICE_ADDRESS is None and __name__ != "__mp_main__":
+    SHARED_MODEL_REGISTRY.preload(quantized=USE_QUANTIZED_MODEL)
 
 
 def play_sound():
@@ -0,0 +1,107 @@
+import unicodedata
+
+import numpy as np
+
+from AhoCorasick import AhoCorasick
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# Characters written in different ways in the tweets, replaced before matching
+EQUIVALENT_CHARACTERS = str.maketrans({'’': "'", '‘': "'", '`': "'"})
+
+
+def get_all_companies(path="App/templates/industry_to_companies.npy"):
+    """
+    Returns the names of the companies from all the industries, in the order in which they are stored
+    """
+    ind_to_comp = np.load(path, allow_pickle=True)
+    companies = []
+    for industry in ind_to_comp[()]:
+        for comp in ind_to_comp[()][industry]:
+            if comp not in companies:
+                companies.append(comp)
+    return companies
+
+
+class CompanyMatcher:
+    def __init__(self, companies=None, aliases=None, min_alias_length=3):
+        """
+        Class that finds, with a single pass over a tweet, all the companies mentioned in it, ignoring the case
+        and the diacritics; a name is matched only as a whole word, so that 'ING' is not found inside 'trading'
+        Parameters
+        ----------
+        companies : list or None
+            the names of the companies, by default all the companies from industry_to_companies.npy
+        aliases : dict or None
+            maps the name of a company to a list of other names under which it appears in the tweets
+        min_alias_length : int
+            the names written without spaces and punctuation (for example 'MegaImage' or 'McDonalds',
+            used in hashtags) are added as aliases only if they have at least this many characters
+        """
+        self.companies = list(companies) if companies is not None else get_all_companies()
+        self.aliases = aliases if aliases is not None else {}
+        self.min_alias_length = min_alias_length
+        patterns = []
+        self.pattern_companies = []
+        self.names = []
+        for company_id in range(len(self.companies)):
+            for name in self.get_names(self.companies[company_id]):
+                pattern = self.fold(name)
+                if len(pattern) == 0 or pattern in patterns:
+                    continue
+                patterns.append(pattern)
+                self.pattern_companies.append(company_id)
+                self.names.append(name)
+        self.automaton = AhoCorasick(patterns)
+
+    def fold(self, text):
+        """
+        Returns the text in lower case, without diacritics
+        """
+        text = unicodedata.normalize('NFKD', text.translate(EQUIVALENT_CHARACTERS).lower())
+        return ''.join([character for character in text if not unicodedata.combining(character)])
+
+    def get_names(self, company):
+        """
+        Returns the name of the company followed by its aliases
+        """
+        names = [company] + list(self.aliases.get(company, []))
+        compact_name = ''.join([character for character in company if character.isalnum()])
+        if len(compact_name) >= self.min_alias_length:
+            names.append(compact_name)
+        return names
+
+    def is_word(self, text, start, end):
+        return (start == 0 or not text[start - 1].isalnum()) and \
+            (end == len(text) or not text[end].isalnum())
+
+    def match(self, text):
+        """
+        Parameters
+        ----------
+        text : string
+
+        Returns
+        ----------
+        companies : list
+            the companies mentioned in the text, in the order in which they were given to the matcher
+        """
+        text = self.fold(text)
+        found = set()
+        for start, end, pattern_id in self.automaton.iter_matches(text):
+            if self.is_word(text, start, end):
+                found.add(self.pattern_companies[pattern_id])
+        return [self.companies[company_id] for company_id in sorted(found)]
+
+    def match_batch(self, texts):
+        """
+        Returns, for every text, the list of companies mentioned in it
+        """
+        return [self.match(text) for text in texts]
+
+    def get_query(self):
+        """
+        Returns the search query that asks for the tweets mentioning any of the companies
+        """
+        return " OR ".join(['"' + name + '"' for name in self.names])
@@ -35,9 +35,6 @@ class EReputationCalculator:
             and where the first element is the impact of negative tweets, the second element for
             the impact of the neutral tweets and the third element the impact of the positive tweets
         """
-        diff = len(my_dates)
-        # Creating the list of labels for the barchart plot
-        scores = [[0] * 3 for i in range(diff)]
         weights = {}
         weights_sum = {}
         """
@@ -100,6 +97,8 @@ class EReputationCalculator:
             column_name = "Industry"
             entity_name = ent.industry
         df = scrapped_df
+        rows = []
+        texts = []
         for i in range(len(df)):
             if df.iloc[i][column_name] == entity_name:
                 text = ""
@@ -109,38 +108,86 @@ class EReputationCalculator:
                     text = ' '.join(df.iloc[i]['Tweet'])
                 if "str" in str(type(df.iloc[i]['Tweet'])):
                     text = df.iloc[i]['Tweet']
+                rows.append(i)
+                texts.append(text)
+
+        # Predicting the sentiment scores of all the tweets at once
+        labels, confidence_scores = prediction_model.predict_batch(texts)
+        for i, label, confidence_score in zip(rows, labels[:, 0], confidence_scores[:, 0]):
+            # Labeling the tweet
+            df.at[i, 'Label'] = self.get_label(
+                label, confidence_score, df.iloc[i]['Tweet'])
+
+            # Creating the weights and weigts_sum dictionaries weighted
+            # after the influence score
+            self.add_to_weights(
+                weights,
+                weights_sum,
+                df.iloc[i]['Month'],
+                df.iloc[i]['Label'],
+                df.iloc[i]['Influence Score'])
+
+        return self.get_scores(weights, weights_sum, my_dates)
+
+    def get_label(self, label, confidence_score, tweet):
+        """
+        Parameters
+        ----------
+        label : string
+            the label predicted by the model
+        confidence_score : float
+            the probability of the predicted label
+        tweet : string or list
+            the tweet that was labeled
 
-                # Predicting the sentiment score
-                label, confidence_score = prediction_model.predict(text)
-                # Labeling the tweet
-                if confidence_score > 0.66:
-                    if label == "__label__negative":
-                        df.at[i, 'Label'] = -1
-                    elif label == "__label__positive":
-                        df.at[i, 'Label'] = 1
-                    else:
-                        print(
-                            "An unexpected label was given for the tweet " +
-                            df.iloc[i]['Tweet'])
-                else:
-                    df.at[i, 'Label'] = 0
-
-                # Creating the weights and weigts_sum dictionaries weighted
-                # after the influence score
-                influence_score = df.iloc[i]['Influence Score']
-                if df.iloc[i]['Month'] not in weights_sum.keys():
-                    weights_sum[df.iloc[i]['Month']] = 0.0
-                    weights_sum[df.iloc[i]['Month']] += influence_score
-                else:
-                    weights_sum[df.iloc[i]['Month']] += influence_score
-                if df.iloc[i]['Month'] not in weights.keys():
-                    weights[df.iloc[i]['Month']] = [0.0] * 3
-                    weights[df.iloc[i]['Month']][df.iloc[i]
-                                                 ['Label'] + 1] += influence_score
-                else:
-                    weights[df.iloc[i]['Month']][df.iloc[i]
-                                                 ['Label'] + 1] += influence_score
+        Returns
+        ----------
+        label : int
+            -1 for a negative tweet, 1 for a positive one and 0 if the model is not confident enough
+        """
+        if confidence_score > 0.66:
+            if label == "__label__negative":
+                return -1
+            elif label == "__label__positive":
+                return 1
+            else:
+                print(
+                    "An unexpected label was given for the tweet " +
+                    str(tweet))
+        return 0
+
+    def add_to_weights(self, weights, weights_sum, month, label, influence_score):
+        """
+        Adds the influence score of a labeled tweet to the weights of its month
+        """
+        if month not in weights_sum.keys():
+            weights_sum[month] = 0.0
+            weights_sum[month] += influence_score
+        else:
+            weights_sum[month] += influence_score
+        if month not in weights.keys():
+            weights[month] = [0.0] * 3
+            weights[month][label + 1] += influence_score
+        else:
+            weights[month][label + 1] += influence_score
+
+    def get_scores(self, weights, weights_sum, my_dates):
+        """
+        Parameters
+        ----------
+        weights : dict
+            maps a month to the sums of the influence scores of its negative, neutral and positive tweets
+        weights_sum : dict
+            maps a month to the sum of the influence scores of its tweets
+        my_dates : list
 
+        Returns
+        ----------
+        scores : list
+            matrix shape (n,3), see get_e_reputation
+        """
+        diff = len(my_dates)
+        scores = [[0] * 3 for i in range(diff)]
         # Inputting the dictionaries with null values where no tweeets were
         # found
         for date in my_dates:
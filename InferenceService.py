@@ -0,0 +1,300 @@
+import os
+import sys
+import time
+import threading
+from queue import Queue, Empty
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+import numpy as np
+
+from ModelRegistry import SHARED_MODEL_REGISTRY, MODEL_NAME, MODEL_PATH
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# The address on which the service waits for the requests of the workers of the host
+INFERENCE_SERVICE_ADDRESS = ("localhost", 6001)
+# The key shared by the service and its clients is never stored in the
+# repository: it is read from this environment variable, or from the file
+# whose path is given by the second one
+AUTHKEY_VARIABLE = "INFERENCE_SERVICE_AUTHKEY"
+AUTHKEY_FILE_VARIABLE = "INFERENCE_SERVICE_AUTHKEY_FILE"
+# Maximum number of connections of the clients waiting to be accepted; the
+# connections over it are dropped when many workers connect at the same time
+LISTENER_BACKLOG = 128
+
+
+def get_authkey():
+    """
+    Returns the key of the InferenceService, read from the INFERENCE_SERVICE_AUTHKEY environment variable or from
+    the file given by INFERENCE_SERVICE_AUTHKEY_FILE; the connections of the service carry pickled objects, so
+    neither the service nor its clients are started without a key
+    """
+    authkey = os.environ.get(AUTHKEY_VARIABLE, "")
+    if authkey == "" and os.environ.get(AUTHKEY_FILE_VARIABLE, "") != "":
+        with open(os.environ[AUTHKEY_FILE_VARIABLE], "r") as f:
+            authkey = f.read().strip()
+    if authkey == "":
+        raise RuntimeError(
+            "The key of the InferenceService must be given in the " + AUTHKEY_VARIABLE +
+            " environment variable or in the file named by " + AUTHKEY_FILE_VARIABLE)
+    return authkey.encode('utf-8')
+
+
+class InferenceService:
+    def __init__(
+            self,
+            model_name=MODEL_NAME,
+            model_path=MODEL_PATH,
+            quantized=False,
+            address=INFERENCE_SERVICE_ADDRESS,
+            authkey=None,
+            max_batch_size=256,
+            max_wait=0.005,
+            cache_size=100000,
+            cache_path=None):
+        """
+        Class that owns the only copy of the model of the host and labels the texts sent by all the workers,
+        the texts of the concurrent requests being grouped in micro-batches labeled with a single call of the model
+        Parameters
+        ----------
+        model_name : string
+        model_path : string
+        quantized : bool
+            if True, the quantized version of the model is loaded, see Model
+        address : tuple
+            (host, port) on which the requests are received
+        authkey : bytes or None
+            the key that the clients must know in order to connect, read by get_authkey if None
+        max_batch_size : int
+            maximum number of texts labeled with a single call of the model
+        max_wait : float
+            maximum number of seconds a request waits for other requests to be labeled together with it
+        cache_size : int
+            maximum number of predictions kept in memory, see PredictionCache
+        cache_path : string or None
+            path of the database in which the predictions are also kept, see PredictionCache
+        """
+        self.model_name = model_name
+        self.model_path = model_path
+        self.quantized = quantized
+        self.address = address
+        self.authkey = authkey if authkey is not None else get_authkey()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self.cache_path = cache_path
+        self.model = None
+        self.listener = None
+        # Contains tuples (texts, k, future) waiting to be labeled
+        self.requests = Queue()
+        self.stopped = threading.Event()
+        # Every connection has at most one request waiting, so the batch is
+        # complete when it has a request from every open connection
+        self.open_connections = 0
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.labeled_texts = 0
+
+    def get_batch(self):
+        """
+        Waits for a request and returns it together with the requests that arrive in the next max_wait seconds,
+        as long as they have less than max_batch_size texts together and some clients can still send requests
+        """
+        batch = [self.requests.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size and len(batch) < self.open_connections:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self.requests.get(timeout=timeout)
+            except Empty:
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def label_batch(self, batch):
+        """
+        Labels the texts of the requests with the same k in a single call of the model, and gives
+        every request its own labels
+        """
+        requests_by_k = {}
+        for texts, k, future in batch:
+            requests_by_k.setdefault(k, []).append((texts, future))
+        for k, requests in requests_by_k.items():
+            texts = [text for request_texts, future in requests for text in request_texts]
+            try:
+                labels, probabilities = self.model.predict_batch(texts, k)
+            except Exception as e:
+                for request_texts, future in requests:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for request_texts, future in requests:
+                end = start + len(request_texts)
+                future.set_result((labels[start:end], probabilities[start:end]))
+                start = end
+            self.batches += 1
+            self.labeled_texts += len(texts)
+
+    def label_requests(self):
+        while not self.stopped.is_set():
+            batch = self.get_batch()
+            # A request without texts is sent by stop, only to wake up
+            # this thread
+            batch = [request for request in batch if request[2] is not None]
+            if len(batch) > 0:
+                self.label_batch(batch)
+
+    def handle_connection(self, connection):
+        """
+        Receives the requests (texts, k) of a client and sends back, one request at a time, the tuple
+        ("ok", labels, probabilities), or ("error", type of the error, message of the error)
+        """
+        with self.lock:
+            self.open_connections += 1
+        try:
+            while not self.stopped.is_set():
+                request = connection.recv()
+                try:
+                    texts, k = request
+                    texts = list(texts)
+                    if not isinstance(k, int) or k < 1 or not all(isinstance(text, str) for text in texts):
+                        raise ValueError("A request must contain a list of strings and a positive k")
+                    future = Future()
+                    self.requests.put((texts, k, future))
+                    labels, probabilities = future.result()
+                    reply = ("ok", labels, probabilities)
+                except Exception as e:
+                    # Only strings are sent back, since the error itself may
+                    # not be picklable
+                    reply = ("error", type(e).__name__, str(e))
+                connection.send(reply)
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self.lock:
+                self.open_connections -= 1
+            connection.close()
+
+    def start(self):
+        """
+        Loads the model and starts receiving requests in background threads
+        """
+        self.model = SHARED_MODEL_REGISTRY.get_prediction_cache(
+            self.model_name, self.model_path, self.quantized, self.cache_size, self.cache_path)
+        self.listener = Listener(self.address, backlog=LISTENER_BACKLOG, authkey=self.authkey)
+        self.address = self.listener.address
+        for target in [self.label_requests, self.accept_connections]:
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+
+    def accept_connections(self):
+        while not self.stopped.is_set():
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # A client that failed to authenticate
+                continue
+            thread = threading.Thread(target=self.handle_connection, args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.requests.put(([], 1, None))
+        try:
+            # Waking up the thread that waits for connections
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+        self.listener.close()
+
+    def serve_forever(self):
+        self.start()
+        self.stopped.wait()
+
+    def get_stats(self):
+        """
+        Returns
+        ----------
+        stats : dict
+            the number of calls of the model, the number of texts labeled and the mean size of the micro-batches
+        """
+        return {
+            'batches': self.batches,
+            'labeled_texts': self.labeled_texts,
+            'mean_batch_size': self.labeled_texts / self.batches if self.batches > 0 else 0.0}
+
+
+class InferenceClient:
+    def __init__(self, address=INFERENCE_SERVICE_ADDRESS, authkey=None):
+        """
+        Class used by the workers for sending texts to the InferenceService; it has the predict and predict_batch
+        methods of the Model, so it can be used in its place. Every thread of the worker has its own connection,
+        which is opened on its first request
+        Parameters
+        ----------
+        address : tuple
+            the address of the InferenceService
+        authkey : bytes or None
+            the key of the InferenceService, read by get_authkey if None
+        """
+        self.address = address
+        self.authkey = authkey if authkey is not None else get_authkey()
+        self.connections = threading.local()
+
+    def get_connection(self):
+        if getattr(self.connections, 'connection', None) is None:
+            self.connections.connection = Client(self.address, authkey=self.authkey)
+        return self.connections.connection
+
+    def send(self, texts, k):
+        try:
+            connection = self.get_connection()
+            connection.send((texts, k))
+            return connection.recv()
+        except (EOFError, OSError):
+            # The service was restarted, so the request is sent again on
+            # a new connection
+            self.connections.connection = None
+            connection = self.get_connection()
+            connection.send((texts, k))
+            return connection.recv()
+
+    def predict(self, text):
+        labels, probabilities = self.predict_batch([text])
+        return labels[0, 0], probabilities[0, 0]
+
+    def predict_batch(self, texts, k=1):
+        """
+        Same as Model.predict_batch, the texts being labeled by the InferenceService
+        """
+        if len(texts) == 0:
+            return np.full((0, k), "", dtype=object), np.zeros((0, k), dtype=np.float64)
+        reply = self.send(list(texts), k)
+        if reply[0] == "error":
+            raise RuntimeError("The InferenceService failed with " + reply[1] + ": " + reply[2])
+        return reply[1], reply[2]
+
+
+def main():
+    """
+    Starts the service of the host: python InferenceService.py [model_path] [--quantized], the key being given
+    in the INFERENCE_SERVICE_AUTHKEY environment variable or in the file named by INFERENCE_SERVICE_AUTHKEY_FILE
+    """
+    arguments = [argument for argument in sys.argv[1:] if argument != "--quantized"]
+    service = InferenceService(
+        model_path=arguments[0] if len(arguments) > 0 else MODEL_PATH,
+        quantized="--quantized" in sys.argv)
+    service.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# Returned by get when the key is not in the cache
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, max_size=100000):
+        """
+        Class that stores at most max_size values, the least recently used one being dropped when it is full
+        Parameters
+        ----------
+        max_size : int
+            maximum number of values kept in the cache
+        """
+        self.max_size = max_size
+        self.values = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, key):
+        """
+        Returns
+        ----------
+        value : the value stored for key, or MISSING if the key is not in the cache
+        """
+        with self.lock:
+            if key in self.values:
+                self.values.move_to_end(key)
+                self.hits += 1
+                return self.values[key]
+            self.misses += 1
+            return MISSING
+
+    def put(self, key, value):
+        with self.lock:
+            self.values[key] = value
+            self.values.move_to_end(key)
+            if len(self.values) > self.max_size:
+                self.values.popitem(last=False)
+
+    def get_stats(self):
+        """
+        Returns
+        ----------
+        stats : dict
+            the number of hits and misses, the hit rate and the number of stored values
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+                'size': len(self.values)}
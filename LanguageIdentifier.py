@@ -0,0 +1,119 @@
+import re
+import hashlib
+
+from langdetect import detect, DetectorFactory
+from langdetect.lang_detect_exception import LangDetectException
+
+from LRUCache import LRUCache, MISSING
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# Makes langdetect return the same language every time it sees a text
+DetectorFactory.seed = 0
+
+# Letters that are found only in Romanian texts; the letters with cedilla
+# (ş, ţ) are also Turkish and ă is also Vietnamese, so the texts written with
+# them are decided by their stop-words or by langdetect
+ROMANIAN_DIACRITICS = set('șȘțȚâÂîÎ')
+
+# Frequent Romanian words (written without diacritics) that are not words in
+# English, Italian or Spanish, so that a text in these languages is never
+# considered Romanian only because of its common words
+ROMANIAN_STOP_WORDS = {
+    'pentru', 'sunt', 'acum', 'foarte', 'fost', 'doar', 'daca', 'mult',
+    'bine', 'nici', 'poate', 'cand', 'avem', 'aveti', 'ceva', 'despre', 'dupa',
+    'acest', 'aceasta', 'prea', 'toti', 'toate', 'vreau', 'trebuie', 'nimic',
+    'niste', 'atat', 'chiar', 'intr', 'dintre', 'catre', 'cele'}
+
+
+class LanguageIdentifier:
+    def __init__(self, min_stop_words=2, cache_size=100000):
+        """
+        Class used for deciding the language of the tweets, which calls langdetect only
+        for the texts that are not obviously Romanian
+        Parameters
+        ----------
+        min_stop_words : int
+            number of Romanian stop-words from which a text is considered Romanian without calling langdetect
+        cache_size : int
+            maximum number of decisions kept in memory
+        """
+        self.min_stop_words = min_stop_words
+        self.cache = LRUCache(cache_size)
+        self.detector_calls = 0
+
+    def get_text_hash(self, text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def is_obviously_romanian(self, text):
+        """
+        Returns True if the text contains Romanian diacritics or enough Romanian stop-words
+        """
+        for character in text:
+            if character in ROMANIAN_DIACRITICS:
+                return True
+        hits = 0
+        for word in re.findall('[a-z]+', text.lower()):
+            if word in ROMANIAN_STOP_WORDS:
+                hits += 1
+                if hits >= self.min_stop_words:
+                    return True
+        return False
+
+    def detect(self, text):
+        """
+        Returns
+        ----------
+        language : string
+            the code of the language of the text, 'unknown' if langdetect could not decide it
+        """
+        if self.is_obviously_romanian(text):
+            return 'ro'
+        self.detector_calls += 1
+        try:
+            return detect(text)
+        except LangDetectException:
+            return 'unknown'
+
+    def identify_batch(self, texts):
+        """
+        Parameters
+        ----------
+        texts : list
+            list of strings
+
+        Returns
+        ----------
+        languages : list
+            the language of every text, the decisions being cached by the hash of the text
+        """
+        languages = [None] * len(texts)
+        pending = {}
+        for i in range(len(texts)):
+            text_hash = self.get_text_hash(texts[i])
+            language = self.cache.get(text_hash)
+            if language is not MISSING:
+                languages[i] = language
+            else:
+                pending.setdefault(text_hash, []).append(i)
+        # Every distinct text is analysed only once
+        for text_hash, positions in pending.items():
+            language = self.detect(texts[positions[0]])
+            self.cache.put(text_hash, language)
+            for i in positions:
+                languages[i] = language
+        return languages
+
+    def identify(self, text):
+        return self.identify_batch([text])[0]
+
+    def get_stats(self):
+        stats = self.cache.get_stats()
+        stats['detector_calls'] = self.detector_calls
+        return stats
+
+
+# Language identifier shared by all the scrappers of this process, so that
+# the decisions are reused between the requests
+SHARED_LANGUAGE_IDENTIFIER = LanguageIdentifier()
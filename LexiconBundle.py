@@ -0,0 +1,245 @@
+import os
+import sys
+import mmap
+import time
+import struct
+from array import array
+from types import MappingProxyType
+
+import numpy as np
+
+from WordTrie import WordTrie
+from LexiconIndex import LexiconIndex
+
+import warnings
+warnings.filterwarnings("ignore")
+
+BUNDLE_MAGIC = b"BALEXBND"
+# Incremented every time the layout of the bundle changes
+BUNDLE_VERSION = 2
+BUNDLE_PATH = "Data/lexicons.bundle"
+# magic, version, number of sections
+HEADER_FORMAT = "<8sII"
+# name, type code ('s' for a list of strings, 'S' for a set of strings), offset, length
+SECTION_FORMAT = "<40s8sQQ"
+# Structures built from the lexicons that are stored in the bundle, with the
+# lexicons they are built from
+DERIVED_LEXICONS = {
+    'word_trie': ['multiple_vowel_words'],
+    'lexicon_index': ['companies', 'cities', 'stop_words']}
+WORD_TRIE_FIELDS = ['first_edge', 'edge_count', 'terminal', 'labels', 'targets']
+LEXICON_INDEX_FIELDS = ['company_substrings', 'city_substrings', 'stop_word_substrings']
+
+
+def encode_strings(strings):
+    """
+    Returns the bytes of a list of strings: their number, the table with the offsets of the strings
+    and the strings, encoded with utf-8
+    """
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = array('I', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return struct.pack("<I", len(encoded)) + offsets.tobytes() + b"".join(encoded)
+
+
+def encode_string_set(strings):
+    """
+    Returns the bytes of a set of strings: their number and the strings separated by NUL characters,
+    encoded with utf-8, so that the whole set is decoded with a single split
+    """
+    strings = sorted(strings)
+    for string in strings:
+        if "\0" in string:
+            raise ValueError("A string of a set contains a NUL character: " + repr(string))
+    return struct.pack("<I", len(strings)) + "\0".join(strings).encode('utf-8')
+
+
+def decode_string_set(view):
+    if struct.unpack_from("<I", view, 0)[0] == 0:
+        return frozenset()
+    return frozenset(str(view[4:], 'utf-8').split("\0"))
+
+
+class StringSection:
+    def __init__(self, view):
+        """
+        List of strings read from a section of the bundle without copying it
+        Parameters
+        ----------
+        view : memoryview
+            the bytes of the section, as written by encode_strings
+        """
+        self.view = view
+        self.count = struct.unpack_from("<I", view, 0)[0]
+        self.offsets = view[4:4 + 4 * (self.count + 1)].cast('I')
+        self.data = view[4 + 4 * (self.count + 1):]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+
+class LexiconBundle:
+    def __init__(self, path):
+        """
+        Class that reads the lexicons from the compiled bundle written by write_bundle, which is faster than parsing
+        their source files and building their structures when a process starts. The file is memory-mapped, but only
+        the arrays of the WordTrie are used in place, their pages being shared by all the processes; the strings,
+        the sets and the LexiconIndex are decoded into objects of every process, which keeps their lookups fast
+        Parameters
+        ----------
+        path : string
+        """
+        self.path = path
+        with open(path, mode="rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.buffer)
+        magic, self.version, section_count = struct.unpack_from(HEADER_FORMAT, self.view, 0)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(path + " is not a lexicon bundle")
+        self.sections = {}
+        position = struct.calcsize(HEADER_FORMAT)
+        for i in range(section_count):
+            name, type_code, offset, length = struct.unpack_from(SECTION_FORMAT, self.view, position)
+            position += struct.calcsize(SECTION_FORMAT)
+            self.sections[name.rstrip(b"\0").decode()] = (type_code.rstrip(b"\0").decode(), offset, length)
+        self.fingerprints = {}
+        for line in self.get_strings('fingerprints'):
+            name, fingerprint = line.split("=")
+            self.fingerprints[name] = fingerprint
+
+    def get_section(self, name):
+        type_code, offset, length = self.sections[name]
+        view = self.view[offset:offset + length]
+        if type_code in ['s', 'S']:
+            return view
+        return view.cast(type_code)
+
+    def get_strings(self, name):
+        return StringSection(self.get_section(name))
+
+    def get_string_set(self, name):
+        return decode_string_set(self.get_section(name))
+
+    def is_fresh(self, source_paths):
+        """
+        Returns True if the bundle has the current version and was built after the last modification
+        of the source files that still exist
+        """
+        if self.version != BUNDLE_VERSION:
+            return False
+        built_at = os.stat(self.path).st_mtime_ns
+        for path in source_paths:
+            if os.path.exists(path) and os.stat(path).st_mtime_ns > built_at:
+                return False
+        return True
+
+    def get_fingerprint(self, name):
+        return self.fingerprints[name]
+
+    def get(self, name):
+        """
+        Returns the lexicon in the same form as LexiconRegistry reads it from its source file
+        """
+        if name == 'multiple_vowel_words':
+            return self.get_string_set(name)
+        if name in ['abbreviations', 'emoji_dict']:
+            dictionary = MappingProxyType(dict(zip(
+                self.get_strings(name + '/keys'), self.get_strings(name + '/values'))))
+            if name == 'abbreviations':
+                return dictionary
+            emoji_dict = np.empty((), dtype=object)
+            emoji_dict[()] = dictionary
+            emoji_dict.flags.writeable = False
+            return emoji_dict
+        strings = np.array(list(self.get_strings(name)), dtype=str)
+        strings.flags.writeable = False
+        return strings
+
+    def get_derived(self, name, fingerprints):
+        """
+        Returns the structure built from the lexicons with the given fingerprints, or None if the bundle
+        does not have it
+        """
+        if name not in DERIVED_LEXICONS or ",".join(fingerprints) != self.fingerprints.get(name):
+            return None
+        if name == 'word_trie':
+            return WordTrie(arrays=tuple(
+                [self.get_section(name + '/' + field) for field in WORD_TRIE_FIELDS]))
+        if name == 'lexicon_index':
+            return LexiconIndex(
+                *[self.get(lexicon_name) for lexicon_name in DERIVED_LEXICONS[name]],
+                substrings=tuple([self.get_string_set(name + '/' + field) for field in LEXICON_INDEX_FIELDS]))
+        return None
+
+
+def write_bundle(path, registry):
+    """
+    Compiles the lexicons of the registry, read from their source files, and the structures built from them
+    into a bundle
+    Parameters
+    ----------
+    path : string
+    registry : LexiconRegistry object
+        a registry that does not use a bundle
+    """
+    sections = []
+    fingerprints = []
+    for name in ['stop_words', 'cities', 'companies']:
+        sections.append((name, 's', encode_strings([str(entry) for entry in registry.get(name)])))
+    sections.append(('multiple_vowel_words', 'S', encode_string_set(registry.get('multiple_vowel_words'))))
+    abbreviations = registry.get('abbreviations')
+    emoji_dict = registry.get('emoji_dict')[()]
+    for name, dictionary in [('abbreviations', abbreviations), ('emoji_dict', emoji_dict)]:
+        sections.append((name + '/keys', 's', encode_strings(list(dictionary.keys()))))
+        sections.append((name + '/values', 's', encode_strings(list(dictionary.values()))))
+    for name in ['stop_words', 'multiple_vowel_words', 'abbreviations', 'emoji_dict', 'cities', 'companies']:
+        fingerprints.append(name + "=" + registry.get_fingerprint_of(name))
+
+    word_trie = WordTrie(registry.get('multiple_vowel_words'))
+    for field, values in zip(WORD_TRIE_FIELDS, word_trie.get_arrays()):
+        sections.append(('word_trie/' + field, values.typecode, values.tobytes()))
+    lexicon_index = LexiconIndex(*[registry.get(name) for name in DERIVED_LEXICONS['lexicon_index']])
+    for field in LEXICON_INDEX_FIELDS:
+        sections.append(('lexicon_index/' + field, 'S', encode_string_set(getattr(lexicon_index, field))))
+    for structure in ['word_trie', 'lexicon_index']:
+        fingerprints.append(structure + '=' + ",".join(
+            [registry.get_fingerprint_of(name) for name in DERIVED_LEXICONS[structure]]))
+    sections.append(('fingerprints', 's', encode_strings(fingerprints)))
+
+    # Every section starts at a multiple of 8 bytes, so that the integer
+    # arrays are aligned
+    position = struct.calcsize(HEADER_FORMAT) + len(sections) * struct.calcsize(SECTION_FORMAT)
+    table = b""
+    data = b""
+    for name, type_code, section in sections:
+        padding = (8 - (position + len(data)) % 8) % 8
+        data += b"\0" * padding
+        table += struct.pack(SECTION_FORMAT, name.encode(), type_code.encode(), position + len(data), len(section))
+        data += section
+    # The bundle replaces the old one only once it is completely written
+    with open(path + ".tmp", mode="wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, BUNDLE_MAGIC, BUNDLE_VERSION, len(sections)))
+        f.write(table)
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def main():
+    from LexiconRegistry import LexiconRegistry, get_data_path
+
+    path = sys.argv[1] if len(sys.argv) > 1 else get_data_path(BUNDLE_PATH)
+    start = time.perf_counter()
+    write_bundle(path, LexiconRegistry(bundle_path=None))
+    print("The lexicons were compiled into " + path + " in %.2f s" % (time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from AhoCorasick import AhoCorasick
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class LexiconIndex:
+    def __init__(self, companies_list, cities_list, custom_sws, substrings=None):
+        """
+        Class that compiles the lexicons of the preprocessor once, so that the checks made for every token
+        do not loop over the lexicons; the answers are the same as the ones given by compare_ignore_case
+        Parameters
+        ----------
+        companies_list : numpy array
+            list of the names of the companies
+        cities_list : numpy array
+            list of strings
+        custom_sws : numpy array
+            list of the stop-words used by the preprocessor
+        substrings : tuple or None
+            the sets (company_substrings, city_substrings, stop_word_substrings) already built from the lexicons,
+            as stored by the LexiconBundle; they are built from the lexicons if None
+        """
+        company_names = [str(comp).lower() for comp in companies_list]
+        # An empty name is contained by every token
+        self.has_empty_company = "" in company_names
+        self.company_automaton = AhoCorasick(
+            [comp for comp in company_names if comp != ""])
+        if substrings is None:
+            substrings = (
+                self.get_substrings(companies_list),
+                self.get_substrings(cities_list),
+                self.get_substrings(custom_sws))
+        self.company_substrings, self.city_substrings, self.stop_word_substrings = substrings
+        self.stop_words = set(custom_sws)
+
+    def get_substrings(self, entries):
+        """
+        Returns the set of all the substrings of the lowercased entries (the empty one included)
+        """
+        substrings = set()
+        for entry in entries:
+            entry = str(entry).lower()
+            substrings.add("")
+            for i in range(len(entry)):
+                for j in range(i + 1, len(entry) + 1):
+                    substrings.add(entry[i:j])
+        return substrings
+
+    def contains_company(self, token):
+        """
+        Returns True if the name of a company is contained by the token, ignoring the case
+        """
+        return self.has_empty_company or self.company_automaton.contains_any(token.lower())
+
+    def is_part_of_company(self, token):
+        """
+        Returns True if the token is contained by the name of a company, ignoring the case
+        """
+        return token.lower() in self.company_substrings
+
+    def is_part_of_city(self, token):
+        return token.lower() in self.city_substrings
+
+    def is_part_of_stop_word(self, token):
+        return token.lower() in self.stop_word_substrings
+
+    def is_stop_word(self, word):
+        return word in self.stop_words
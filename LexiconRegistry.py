@@ -0,0 +1,219 @@
+import os
+import time
+import hashlib
+import threading
+from types import MappingProxyType
+
+import numpy as np
+
+from LexiconBundle import LexiconBundle, BUNDLE_PATH
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# The files of the lexicons, relative to the Data directory of the project
+LEXICON_PATHS = {
+    'stop_words': "Data/Custom stop-words and emojis/custom_stop_words_list.npy",
+    'multiple_vowel_words': "Data/Romanian words with their lemma's/multiple_vowel_words_rom_lang.txt",
+    'abbreviations': "Data/Custom stop-words and emojis/common_abbreviations_ro.txt",
+    'emoji_dict': "Data/Custom stop-words and emojis/emoji_dict.npy",
+    'cities': "Data/Custom stop-words and emojis/cities_list.npy",
+    'companies': "Data/Companies/companies_list.npy",
+}
+
+
+def get_data_path(path):
+    """
+    Returns the path of a file of the project, which is found in the Brand-analysis-master directory
+    when the application is not started from it
+    """
+    if "Brand-analysis-master" not in str(os.getcwd()):
+        return "Brand-analysis-master/" + path
+    return path
+
+
+class LexiconRegistry:
+    def __init__(self, reload_check_interval=5.0, bundle_path=BUNDLE_PATH):
+        """
+        Class that loads every lexicon of the preprocessor only once for the whole process, when it is first
+        needed; the lexicons are returned as read-only objects, so they can be shared by all the preprocessors
+        Parameters
+        ----------
+        reload_check_interval : float or None
+            minimum number of seconds between two checks of the modification time of a lexicon file;
+            a lexicon is read again when its file was modified, and never checked again if None
+        bundle_path : string or None
+            the path, relative to the project, of the bundle compiled by LexiconBundle.py; the lexicons are read
+            from the bundle while it is newer than their source files, and from the source files otherwise
+        """
+        self.reload_check_interval = reload_check_interval
+        self.bundle_path = bundle_path
+        self.bundle = None
+        self.lock = threading.RLock()
+        # Maps the name of a lexicon to a dict with its value, the
+        # modification time of its file, its fingerprint, the duration of
+        # the last loading and the moment of the last check
+        self.entries = {}
+        # Maps the name of a structure built from lexicons to a tuple
+        # (fingerprints of the lexicons, structure)
+        self.derived = {}
+        self.readers = {
+            'stop_words': self.read_array,
+            'multiple_vowel_words': self.read_multiple_vowel_words,
+            'abbreviations': self.read_abbreviations,
+            'emoji_dict': self.read_emoji_dict,
+            'cities': self.read_array,
+            'companies': self.read_array,
+        }
+
+    def read_array(self, path):
+        array = np.load(path, allow_pickle=True)
+        array.flags.writeable = False
+        return array
+
+    def read_multiple_vowel_words(self, path):
+        multiple_vowel_words_set = set()
+        with open(path, encoding='utf-8', mode="r") as f:
+            lines = f.readlines()
+            for line in lines:
+                multiple_vowel_words_set.add(line[:-1])
+        return frozenset(multiple_vowel_words_set)
+
+    def read_abbreviations(self, path):
+        abbrev_dict = {}
+        with open(path, "r") as f:
+            lines = f.readlines()
+            for line in lines:
+                words = line.split("=")
+                if len(words) == 1:
+                    break
+                words[0] = " " + words[0]
+                words[1] = words[1][:-1] + " "
+                abbrev_dict[words[0]] = words[1]
+        return MappingProxyType(abbrev_dict)
+
+    def read_emoji_dict(self, path):
+        # The dictionary stays wrapped in a 0-d array, as it is stored in
+        # the file, since it is accessed with emoji_dict[()]
+        emoji_dict = np.empty((), dtype=object)
+        emoji_dict[()] = MappingProxyType(np.load(path, allow_pickle=True)[()])
+        emoji_dict.flags.writeable = False
+        return emoji_dict
+
+    def get_fingerprint(self, path):
+        with open(path, mode="rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+    def get_bundle(self):
+        """
+        Returns the LexiconBundle, or None if there is no bundle or if it is older than the source files
+        """
+        if self.bundle_path is None:
+            return None
+        if self.bundle is None:
+            path = get_data_path(self.bundle_path)
+            if not os.path.exists(path):
+                return None
+            self.bundle = LexiconBundle(path)
+        source_paths = [get_data_path(path) for path in LEXICON_PATHS.values()]
+        if not self.bundle.is_fresh(source_paths):
+            return None
+        return self.bundle
+
+    def load(self, name):
+        path = get_data_path(LEXICON_PATHS[name])
+        start = time.perf_counter()
+        modification_time = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        bundle = self.get_bundle()
+        if bundle is not None:
+            value = bundle.get(name)
+            fingerprint = bundle.get_fingerprint(name)
+        else:
+            value = self.readers[name](path)
+            fingerprint = self.get_fingerprint(path)
+        self.entries[name] = {
+            'value': value,
+            'modification_time': modification_time,
+            'fingerprint': fingerprint,
+            'load_time': time.perf_counter() - start,
+            'checked_at': time.monotonic()}
+
+    def is_outdated(self, name):
+        entry = self.entries[name]
+        if self.reload_check_interval is None or \
+                time.monotonic() - entry['checked_at'] < self.reload_check_interval:
+            return False
+        entry['checked_at'] = time.monotonic()
+        try:
+            path = get_data_path(LEXICON_PATHS[name])
+            return os.stat(path).st_mtime_ns != entry['modification_time']
+        except OSError:
+            # The lexicon already loaded is kept while its file is missing
+            return False
+
+    def get_entry(self, name):
+        with self.lock:
+            if name not in self.entries or self.is_outdated(name):
+                self.load(name)
+            return self.entries[name]
+
+    def get(self, name):
+        """
+        Parameters
+        ----------
+        name : string
+            one of the keys of LEXICON_PATHS
+
+        Returns
+        ----------
+        value : the lexicon, loaded from its file the first time it is requested or after its file was modified
+        """
+        return self.get_entry(name)['value']
+
+    def get_fingerprint_of(self, name):
+        """
+        Returns the hash of the content of the file from which the lexicon was loaded
+        """
+        return self.get_entry(name)['fingerprint']
+
+    def get_derived(self, name, lexicon_names, build):
+        """
+        Parameters
+        ----------
+        name : string
+            the name of a structure built from lexicons
+        lexicon_names : list
+            the names of the lexicons from which the structure is built
+        build : function
+            receives the lexicons, in the order of lexicon_names, and returns the structure
+
+        Returns
+        ----------
+        structure : the structure, built again only when one of its lexicons was reloaded
+        """
+        with self.lock:
+            lexicons = [self.get(lexicon_name) for lexicon_name in lexicon_names]
+            fingerprints = [self.get_fingerprint_of(lexicon_name) for lexicon_name in lexicon_names]
+            if name not in self.derived or self.derived[name][0] != fingerprints:
+                structure = None
+                bundle = self.get_bundle()
+                if bundle is not None:
+                    structure = bundle.get_derived(name, fingerprints)
+                if structure is None:
+                    structure = build(*lexicons)
+                self.derived[name] = (fingerprints, structure)
+            return self.derived[name][1]
+
+    def get_load_timings(self):
+        """
+        Returns
+        ----------
+        timings : dict
+            maps the name of every loaded lexicon to the number of seconds its last loading took
+        """
+        with self.lock:
+            return {name: entry['load_time'] for name, entry in self.entries.items()}
+
+
+# Lexicons shared by all the preprocessors and visualizers of this process
+SHARED_LEXICON_REGISTRY = LexiconRegistry()
@@ -1,8 +1,54 @@
+import os
+import sys
+
 import fasttext
 
+import numpy as np
+
+
+def get_quantized_path(model_path):
+    """
+    Returns the path of the quantized model built from the model found at model_path
+    """
+    return os.path.splitext(model_path)[0] + ".ftz"
+
+
+def quantize_model(model_path, train_path=None, cutoff=0, dsub=2, qnorm=True):
+    """
+    Builds the quantized version of a fastText model, which takes less memory and loads faster,
+    and saves it next to the model, at get_quantized_path(model_path)
+    Parameters
+    ----------
+    model_path : string
+        the path of the model trained at full precision
+    train_path : string or None
+        the training file of the model; when given together with a cutoff, the model is retrained after the cutoff
+    cutoff : int
+        the number of words and ngrams kept, all of them being kept if 0
+    dsub : int
+        the size of the subvectors of the product quantization, a larger one taking less memory
+    qnorm : bool
+        if True, the norms of the vectors are quantized separately
+
+    Returns
+    ----------
+    quantized_path : string
+        the path of the quantized model
+    """
+    model = fasttext.load_model(model_path)
+    model.quantize(
+        input=train_path,
+        cutoff=cutoff,
+        retrain=train_path is not None and cutoff > 0,
+        dsub=dsub,
+        qnorm=qnorm)
+    quantized_path = get_quantized_path(model_path)
+    model.save_model(quantized_path)
+    return quantized_path
+
 
 class Model:
-    def __init__(self, model_name, model_path):
+    def __init__(self, model_name, model_path, quantized=False):
         """
         Class that stores the prediction model
         Parameters
@@ -11,11 +57,14 @@ class Model:
             stores the name of the model
         model_path : string
             stores the path from where to load the model
+        quantized : bool
+            if True, the quantized version of the model, built by quantize_model, is loaded in its place
         """
         self.model_name = model_name
+        self.quantized = quantized
         if self.model_name == 'FastText':
-            self.model_path = model_path
-            self.model = fasttext.load_model(model_path)
+            self.model_path = get_quantized_path(model_path) if quantized else model_path
+            self.model = fasttext.load_model(self.model_path)
         else:
             self.model_path = ""
             self.model = None
@@ -23,3 +72,45 @@ class Model:
     def predict(self, text):
         label_arr = self.model.predict(text)
         return label_arr[0][0], label_arr[1][0]
+
+    def predict_batch(self, texts, k=1):
+        """
+        Parameters
+        ----------
+        texts : list
+            the texts to be labeled, each of them on a single line
+        k : int
+            the number of labels predicted for every text
+
+        Returns
+        ----------
+        tuple : (labels, probabilities)
+            labels : numpy array of strings with the shape (len(texts), k), the most probable labels
+                of every text in decreasing order of their probability
+            probabilities : numpy array of float64 with the shape (len(texts), k), the probabilities of the labels,
+                of the same type as the one returned by predict; when the model has less than k labels, the missing
+                labels are "" with the probability 0
+        """
+        labels = np.full((len(texts), k), "", dtype=object)
+        probabilities = np.zeros((len(texts), k), dtype=np.float64)
+        if len(texts) == 0:
+            return labels, probabilities
+        # fastText labels all the texts of the list in a single call
+        all_labels, all_probabilities = self.model.predict(list(texts), k=k)
+        for i in range(len(texts)):
+            labels[i, :len(all_labels[i])] = all_labels[i]
+            probabilities[i, :len(all_probabilities[i])] = all_probabilities[i]
+        return labels, probabilities
+
+
+def main():
+    """
+    Builds the quantized model: python Model.py model_path [train_path]
+    """
+    model_path = sys.argv[1]
+    train_path = sys.argv[2] if len(sys.argv) > 2 else None
+    print("Quantized model saved at " + quantize_model(model_path, train_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import time
+import resource
+import threading
+
+from Model import Model
+from PredictionCache import PredictionCache
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# The model used for labeling the tweets
+MODEL_NAME = 'FastText'
+MODEL_PATH = 'model_tweets-0.99-0.01-0.0.bin'
+
+
+def get_resident_memory():
+    """
+    Returns the number of bytes of memory currently used by the process, or its peak when the
+    current value can not be read
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ModelRegistry:
+    def __init__(self):
+        """
+        Class that loads every prediction model only once for the whole process, the first time it is
+        requested or when the worker starts, so that all the requests share the same loaded model
+        """
+        self.lock = threading.Lock()
+        # Maps (model_name, model_path, quantized) to a dict with the model, the
+        # lock of its loading, the duration of its loading and its memory
+        self.entries = {}
+        # Maps (model_name, model_path, quantized, cache_path) to the PredictionCache
+        # placed in front of the model
+        self.prediction_caches = {}
+
+    def get_entry(self, model_name, model_path, quantized=False):
+        with self.lock:
+            key = (model_name, model_path, quantized)
+            if key not in self.entries:
+                self.entries[key] = {
+                    'model': None,
+                    'lock': threading.Lock(),
+                    'load_time': None,
+                    'memory': None,
+                    'file_size': None}
+            entry = self.entries[key]
+        # The models are loaded under their own locks, so loading a model
+        # does not block the requests of the models already loaded
+        with entry['lock']:
+            if entry['model'] is None:
+                memory_before = get_resident_memory()
+                start = time.perf_counter()
+                model = Model(model_name, model_path, quantized)
+                entry['load_time'] = time.perf_counter() - start
+                entry['memory'] = max(get_resident_memory() - memory_before, 0)
+                if os.path.exists(model.model_path):
+                    entry['file_size'] = os.path.getsize(model.model_path)
+                entry['model'] = model
+        return entry
+
+    def get(self, model_name=MODEL_NAME, model_path=MODEL_PATH, quantized=False):
+        """
+        Parameters
+        ----------
+        model_name : string
+            the name of the model, as given to Model
+        model_path : string
+            the path from where the model is loaded
+        quantized : bool
+            if True, the quantized version of the model is loaded, see Model
+
+        Returns
+        ----------
+        model : Model object
+            the model, loaded the first time it is requested
+        """
+        return self.get_entry(model_name, model_path, quantized)['model']
+
+    def get_prediction_cache(
+            self,
+            model_name=MODEL_NAME,
+            model_path=MODEL_PATH,
+            quantized=False,
+            cache_size=100000,
+            cache_path=None):
+        """
+        Parameters
+        ----------
+        model_name : string
+        model_path : string
+        quantized : bool
+        cache_size : int
+            maximum number of predictions kept in memory
+        cache_path : string or None
+            path of the database in which the predictions are also kept, see PredictionCache
+
+        Returns
+        ----------
+        prediction_cache : PredictionCache object
+            the cache placed in front of the model, created the first time it is requested, so that
+            the predictions it remembers are shared by all the requests
+        """
+        model = self.get(model_name, model_path, quantized)
+        with self.lock:
+            key = (model_name, model_path, quantized, cache_path)
+            if key not in self.prediction_caches:
+                self.prediction_caches[key] = PredictionCache(model, cache_size, cache_path)
+            return self.prediction_caches[key]
+
+    def preload(self, model_name=MODEL_NAME, model_path=MODEL_PATH, quantized=False):
+        """
+        Loads the model when the worker starts, instead of on its first request
+        """
+        self.get_entry(model_name, model_path, quantized)
+
+    def get_stats(self):
+        """
+        Returns
+        ----------
+        stats : dict
+            maps (model_name, model_path, quantized) of every loaded model to a dict with the number of seconds
+            its loading took, the number of bytes by which it increased the memory of the process and the size
+            of its file
+        """
+        with self.lock:
+            entries = list(self.entries.items())
+        stats = {}
+        for key, entry in entries:
+            if entry['model'] is not None:
+                stats[key] = {
+                    'load_time': entry['load_time'],
+                    'memory': entry['memory'],
+                    'file_size': entry['file_size']}
+        return stats
+
+
+# Models shared by all the requests handled by this process
+SHARED_MODEL_REGISTRY = ModelRegistry()
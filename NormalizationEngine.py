@@ -0,0 +1,83 @@
+import warnings
+warnings.filterwarnings("ignore")
+
+# The Romanian letters with diacritics and the letters that replace them
+DIACRITICS_TABLE = str.maketrans("ăâîțșĂÂÎȚȘ", "aaitsAAITS")
+
+
+class NormalizationEngine:
+    def __init__(self, abbrev_dict, emoji_dict):
+        """
+        Class built once from the lexicons, that replaces the diacritics, the abbreviations and the emoticons
+        of the tokens with the same results as the lookups made on the lexicons themselves
+        Parameters
+        ----------
+        abbrev_dict : dict
+            dictionary that maps a string to another string, the keys being padded with spaces
+        emoji_dict : numpy array
+            dictionary that maps an emoticon to labels "bun" or "rau", wrapped in a 0-d array
+        """
+        # The keys are looked up as " " + token + " ", so only the keys
+        # padded with spaces can be found
+        self.abbreviations = {}
+        for key, value in abbrev_dict.items():
+            if len(key) >= 2 and key[0] == " " and key[-1] == " ":
+                self.abbreviations[key[1:-1]] = value
+        self.emoticons = {}
+        try:
+            for key, value in emoji_dict[()].items():
+                if isinstance(key, str) and isinstance(value, str):
+                    self.emoticons[key] = value
+        except BaseException:
+            # The preprocessor never replaces the emoticons of a dictionary
+            # that is not wrapped in an array
+            pass
+        # A replacement only adds the letters of the labels, so it never
+        # creates an emoticon that has none of these letters
+        label_letters = set("".join(self.emoticons.values()))
+        self.stable_emoticons = {key for key in self.emoticons if not set(key) & label_letters}
+
+    def eliminate_diacritics(self, word):
+        return word.translate(DIACRITICS_TABLE)
+
+    def get_abbreviation(self, word):
+        """
+        Returns the text that replaces the word, or None if the word is not an abbreviation
+        """
+        return self.abbreviations.get(word)
+
+    def join_pieces(self, processed_tokens):
+        """
+        Parameters
+        ----------
+        processed_tokens : list
+            the list contains the tuples (piece, token) returned by TweetPreprocessor.process_raw_token
+            for the tokens of a tweet
+
+        Returns
+        ----------
+        text : string
+            the pieces joined, every emoticon token being replaced with its label in the text built
+            until the token, as text.replace would do
+        """
+        pieces = []
+        # Maps every emoticon already replaced to the number of pieces in
+        # which it was replaced, so that only the later pieces are searched
+        # when it appears again
+        replaced_until = {}
+        for piece, token in processed_tokens:
+            pieces.append(piece)
+            value = self.emoticons.get(token)
+            if value is None:
+                continue
+            if token == "" or " " in token:
+                # Such a token may be found across two pieces
+                pieces = ["".join(pieces).replace(token, value)]
+                replaced_until = {}
+                continue
+            start = replaced_until.get(token, 0) if token in self.stable_emoticons else 0
+            for i in range(start, len(pieces)):
+                if token in pieces[i]:
+                    pieces[i] = pieces[i].replace(token, value)
+            replaced_until[token] = len(pieces)
+        return "".join(pieces)
@@ -0,0 +1,175 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+
+import numpy as np
+
+from LRUCache import LRUCache, MISSING
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# Maximum number of keys sent in a single query
+QUERY_SIZE = 500
+
+
+def get_model_identity(model):
+    """
+    Returns a string that changes when the model is replaced, built from its name and the path, the size and
+    the modification time of its file
+    """
+    identity = model.model_name + ":" + os.path.abspath(model.model_path)
+    if os.path.exists(model.model_path):
+        stat = os.stat(model.model_path)
+        identity += ":" + str(stat.st_size) + ":" + str(stat.st_mtime_ns)
+    return identity
+
+
+class PredictionCache:
+    def __init__(self, model, cache_size=100000, path=None):
+        """
+        Class placed in front of a Model, which remembers the labels predicted for every preprocessed text, so that
+        the retweets and the copies of a tweet, which have the same tokens, are labeled only once; it has the
+        predict and predict_batch methods of the Model, so it can be used in its place
+        Parameters
+        ----------
+        model : Model object
+            the model whose predictions are remembered
+        cache_size : int
+            maximum number of predictions kept in memory
+        path : string or None
+            path of the SQLite database file in which the predictions are also kept, so that they are
+            shared by the processes and survive them; the predictions are kept only in memory if None
+        """
+        self.model = model
+        self.model_name = model.model_name
+        self.model_path = model.model_path
+        self.model_identity = get_model_identity(model)
+        self.memory_cache = LRUCache(cache_size)
+        self.path = path
+        self.lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+        # The texts of a batch that have the same key as an earlier text of
+        # the batch, which are labeled only once
+        self.duplicates = 0
+        self.connection = None
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory != "" and not os.path.exists(directory):
+                os.makedirs(directory)
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            with self.lock, self.connection:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS predictions ("
+                    "model TEXT, key TEXT, labels TEXT, probabilities TEXT, PRIMARY KEY (model, key))")
+
+    def get_key(self, text, k):
+        """
+        Returns the key of the prediction of the k labels of a text; the text is normalized by joining its tokens
+        with single spaces, since fastText splits the text on whitespaces
+        """
+        return str(k) + ":" + " ".join(text.split())
+
+    def get_disk_key(self, key):
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_many_from_disk(self, keys):
+        """
+        Returns a dict that maps the keys found on disk to the tuples (labels, probabilities)
+        """
+        disk_keys = {self.get_disk_key(key): key for key in keys}
+        parts = list(disk_keys.keys())
+        predictions = {}
+        with self.lock:
+            for i in range(0, len(parts), QUERY_SIZE):
+                part = parts[i:i + QUERY_SIZE]
+                rows = self.connection.execute(
+                    "SELECT key, labels, probabilities FROM predictions WHERE model = ? AND key IN (" +
+                    ", ".join(["?"] * len(part)) + ")", [self.model_identity] + part).fetchall()
+                for disk_key, labels, probabilities in rows:
+                    predictions[disk_keys[disk_key]] = (
+                        tuple(json.loads(labels)), tuple(json.loads(probabilities)))
+            self.disk_hits += len(predictions)
+            self.disk_misses += len(keys) - len(predictions)
+        return predictions
+
+    def put_many_on_disk(self, predictions):
+        if len(predictions) == 0:
+            return
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                [(self.model_identity, self.get_disk_key(key), json.dumps(labels, ensure_ascii=False),
+                  json.dumps(probabilities)) for key, (labels, probabilities) in predictions.items()])
+
+    def predict(self, text):
+        labels, probabilities = self.predict_batch([text])
+        return labels[0, 0], probabilities[0, 0]
+
+    def predict_batch(self, texts, k=1):
+        """
+        Same as Model.predict_batch; only the texts whose predictions are neither in memory nor on disk
+        are labeled by the model
+        """
+        keys = [self.get_key(text, k) for text in texts]
+        with self.lock:
+            self.duplicates += len(keys) - len(set(keys))
+        predictions = {}
+        for key in set(keys):
+            prediction = self.memory_cache.get(key)
+            if prediction is not MISSING:
+                predictions[key] = prediction
+        missing_keys = [key for key in set(keys) if key not in predictions]
+        if self.connection is not None and len(missing_keys) > 0:
+            disk_predictions = self.get_many_from_disk(missing_keys)
+            for key, prediction in disk_predictions.items():
+                self.memory_cache.put(key, prediction)
+            predictions.update(disk_predictions)
+            missing_keys = [key for key in missing_keys if key not in predictions]
+        if len(missing_keys) > 0:
+            # The normalized texts are labeled, each of them only once
+            labels, probabilities = self.model.predict_batch(
+                [key.split(":", 1)[1] for key in missing_keys], k)
+            new_predictions = {}
+            for i, key in enumerate(missing_keys):
+                new_predictions[key] = (
+                    tuple(labels[i].tolist()), tuple(probabilities[i].tolist()))
+                self.memory_cache.put(key, new_predictions[key])
+            if self.connection is not None:
+                self.put_many_on_disk(new_predictions)
+            predictions.update(new_predictions)
+
+        labels = np.full((len(texts), k), "", dtype=object)
+        probabilities = np.zeros((len(texts), k), dtype=np.float64)
+        for i, key in enumerate(keys):
+            labels[i] = predictions[key][0]
+            probabilities[i] = predictions[key][1]
+        return labels, probabilities
+
+    def get_stats(self):
+        """
+        Returns
+        ----------
+        stats : dict
+            the statistics of the memory tier, as returned by LRUCache.get_stats, the hits and misses of the disk
+            tier, which is only read on the misses of the memory tier, the number of texts that repeated an
+            earlier text of their batch, and the hit rate of all the texts, the repeated ones counting as hits
+        """
+        memory_stats = self.memory_cache.get_stats()
+        with self.lock:
+            disk_lookups = self.disk_hits + self.disk_misses
+            duplicates = self.duplicates
+            disk_stats = {
+                'hits': self.disk_hits,
+                'misses': self.disk_misses,
+                'hit_rate': self.disk_hits / disk_lookups if disk_lookups > 0 else 0.0}
+        lookups = memory_stats['hits'] + memory_stats['misses'] + duplicates
+        hits = memory_stats['hits'] + disk_stats['hits'] + duplicates
+        return {
+            'memory': memory_stats,
+            'disk': disk_stats,
+            'duplicates': duplicates,
+            'hit_rate': hits / lookups if lookups > 0 else 0.0}
@@ -0,0 +1,87 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# Incremented every time a change of the preprocessor changes the tokens it
+# returns, so that the tokens cached before are not used anymore
+PREPROCESSING_VERSION = 1
+# Maximum number of keys sent in a single query
+QUERY_SIZE = 500
+
+
+class PreprocessingCache:
+    def __init__(self, path):
+        """
+        Class that keeps on disk the tokens returned by the preprocessor for every tweet, so that the tweets
+        covered by several analyses are preprocessed only once; the tokens are stored together with the hash of
+        the configuration of the preprocessor, so changing the configuration invalidates them
+        Parameters
+        ----------
+        path : string
+            path of the SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS processed_tweets ("
+                "key TEXT, config TEXT, tokens TEXT, PRIMARY KEY (key, config))")
+
+    def get_key(self, text, id=None):
+        """
+        Returns the key of a tweet: its id when it is known, the hash of its text otherwise
+        """
+        if id is not None:
+            return "id:" + str(id)
+        return "text:" + hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_many(self, keys, config):
+        """
+        Parameters
+        ----------
+        keys : list
+            the keys of the tweets, as returned by get_key
+        config : string
+            the hash of the configuration of the preprocessor
+
+        Returns
+        ----------
+        tokens : dict
+            maps the keys found in the cache to the lists of tokens of the tweets
+        """
+        keys = list(set(keys))
+        tokens = {}
+        with self.lock:
+            for i in range(0, len(keys), QUERY_SIZE):
+                part = keys[i:i + QUERY_SIZE]
+                rows = self.connection.execute(
+                    "SELECT key, tokens FROM processed_tweets WHERE config = ? AND key IN (" +
+                    ", ".join(["?"] * len(part)) + ")", [config] + part).fetchall()
+                for key, value in rows:
+                    tokens[key] = json.loads(value)
+        return tokens
+
+    def put_many(self, tokens, config):
+        """
+        Parameters
+        ----------
+        tokens : dict
+            maps the keys of the tweets to their lists of tokens
+        config : string
+            the hash of the configuration of the preprocessor
+        """
+        if len(tokens) == 0:
+            return
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO processed_tweets VALUES (?, ?, ?)",
+                [(key, config, json.dumps(value, ensure_ascii=False)) for key, value in tokens.items()])
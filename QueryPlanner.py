@@ -0,0 +1,89 @@
+import math
+
+from Company import Company
+from EReputationCalculator import EReputationCalculator
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class QueryPlanner:
+    def __init__(self, min_tweets_per_shard=20, shard_by_month=True):
+        """
+        Class that splits the periods that have to be scrapped into monthly shards, each shard
+        receiving its own tweet budget, so that every month of the analysis gets enough tweets
+        and the shards can be requested in parallel
+        Parameters
+        ----------
+        min_tweets_per_shard : int
+            minimum number of tweets requested for a shard
+        shard_by_month : bool
+            if False, every period is requested with a single query, as a single shard
+        """
+        self.min_tweets_per_shard = min_tweets_per_shard
+        self.shard_by_month = shard_by_month
+        self.erep_calc = EReputationCalculator()
+
+    def get_next_month_start(self, month):
+        """
+        Returns the first day of the month following month, where month has the format 'YYYY-MM'
+        """
+        year = int(month[:4])
+        month = int(month[5:7])
+        if month == 12:
+            return str(year + 1) + "-01-01"
+        if month < 9:
+            return str(year) + "-0" + str(month + 1) + "-01"
+        return str(year) + "-" + str(month + 1) + "-01"
+
+    def split_into_shards(self, since, until):
+        """
+        Parameters
+        ----------
+        since : string
+        until : string
+            the period, with the dates in the format "YYYY-MM-DD"
+
+        Returns
+        ----------
+        shards : list
+            the list contains tuples (since, until), one for every month of the period
+        """
+        if not self.shard_by_month:
+            return [(since, until)]
+        shards = []
+        for month in self.erep_calc.get_monthly_dates(Company("", "", since, until)):
+            shard_since = max(month + "-01", since)
+            shard_until = min(self.get_next_month_start(month), until)
+            if shard_since < shard_until:
+                shards.append((shard_since, shard_until))
+        return shards
+
+    def get_shard_budget(self, no_of_tweets, no_of_shards):
+        """
+        Returns the number of tweets requested for every shard when no_of_tweets are wanted for the whole analysis
+        """
+        if no_of_shards == 0:
+            return 0
+        return max(self.min_tweets_per_shard,
+                   int(math.ceil(no_of_tweets / no_of_shards)))
+
+    def plan(self, ranges, no_of_tweets):
+        """
+        Parameters
+        ----------
+        ranges : list
+            the list contains tuples (since, until) with the periods that have to be scrapped
+        no_of_tweets : int
+            the number of tweets wanted for all the periods together
+
+        Returns
+        ----------
+        shards : list
+            the list contains tuples (since, until, max_tweets), in chronological order
+        """
+        shards = []
+        for since, until in ranges:
+            shards.extend(self.split_into_shards(since, until))
+        budget = self.get_shard_budget(no_of_tweets, len(shards))
+        return [(since, until, budget) for since, until in shards]
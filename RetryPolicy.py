@@ -0,0 +1,165 @@
+import random
+import threading
+import time
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class RetryError(Exception):
+    """
+    Raised when a request still fails after all the retries allowed by the RetryPolicy
+    """
+    pass
+
+
+class CircuitOpenError(RetryError):
+    """
+    Raised when a request is refused because the circuit breaker is open
+    """
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        """
+        Class used for stopping the requests towards a source that keeps failing
+        Parameters
+        ----------
+        failure_threshold : int
+            number of consecutive failures after which the circuit is opened
+        reset_timeout : float
+            number of seconds after which a trial request is let through an open circuit
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+
+    def get_state(self):
+        """
+        Returns
+        ----------
+        state : string
+            'closed' when the requests are let through, 'open' when they are refused
+            and 'half-open' when a trial request may be let through
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow_request(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_in_progress:
+                return False
+            self.trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.trial_in_progress or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_progress = False
+
+
+# Circuit breaker shared by all the requests made towards Twitter from this
+# process
+SHARED_CIRCUIT_BREAKER = CircuitBreaker()
+
+
+class RetryPolicy:
+    def __init__(
+            self,
+            max_retries=4,
+            base_delay=1.0,
+            max_delay=30.0,
+            circuit_breaker=SHARED_CIRCUIT_BREAKER):
+        """
+        Class used for retrying the failed requests with an exponential backoff with jitter
+        Parameters
+        ----------
+        max_retries : int
+            maximum number of retries made for a single request
+        base_delay : float
+            number of seconds waited before the first retry
+        max_delay : float
+            maximum number of seconds waited between two attempts
+        circuit_breaker : CircuitBreaker or None
+            circuit breaker consulted before every attempt
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.circuit_breaker = circuit_breaker
+        self.lock = threading.Lock()
+        self.counters = {
+            'attempts': 0,
+            'failures': 0,
+            'rejected': 0,
+            'waiting_time': 0.0}
+
+    def get_delay(self, attempt):
+        """
+        Returns the number of seconds waited after the attempt-th failed attempt ("full jitter" backoff)
+        """
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def increment(self, counter, value=1):
+        with self.lock:
+            self.counters[counter] += value
+
+    def get_counters(self):
+        with self.lock:
+            return dict(self.counters)
+
+    def call(self, function, *args):
+        """
+        Calls function(*args) until it returns a result that is not None
+
+        Returns
+        ----------
+        result : the result of the function
+
+        Raises
+        ----------
+        CircuitOpenError : if the circuit breaker refused the request
+        RetryError : if all the attempts failed
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow_request():
+                self.increment('rejected')
+                raise CircuitOpenError("The circuit breaker is open")
+            self.increment('attempts')
+            try:
+                result = function(*args)
+                if result is None:
+                    raise ValueError("No result was returned")
+            except Exception as e:
+                self.increment('failures')
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise RetryError(
+                        "The request failed " + str(attempt + 1) + " times") from e
+                delay = self.get_delay(attempt)
+                self.increment('waiting_time', delay)
+                time.sleep(delay)
+                continue
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success()
+            return result
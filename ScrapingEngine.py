@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# The limiters are shared by all the engines of the process, the limiters of
+# the sources being mapped by the name of the source; every scrapping request
+# creates its own engine, so a limiter of a single engine would never see the
+# requests made by the others
+SOURCE_LIMITERS = {}
+LIMITERS_LOCK = threading.Lock()
+
+
+class RateLimiter:
+    def __init__(self, rate=None):
+        """
+        Class used for spacing out the calls made towards a tweet source
+        Parameters
+        ----------
+        rate : float or None
+            maximum number of calls per second, None meaning that the calls are not limited
+        """
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def acquire(self):
+        """
+        Blocks the calling thread until it is allowed to perform the next call
+        """
+        if self.rate is None or self.rate <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            wait_time = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + 1.0 / self.rate
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    def restrict(self, rate):
+        """
+        Lowers the rate of the limiter to the given rate, None meaning that the rate is not changed
+        """
+        if rate is None or rate <= 0:
+            return
+        with self.lock:
+            if self.rate is None or self.rate <= 0 or rate < self.rate:
+                self.rate = rate
+
+
+# Limits the requests made by the whole process, over all the sources
+GLOBAL_LIMITER = RateLimiter()
+
+
+class ScrapingEngine:
+    def __init__(
+            self,
+            max_workers=8,
+            global_rate_limit=None,
+            per_source_rate_limit=None):
+        """
+        Class used for running the scrapping requests concurrently
+        Parameters
+        ----------
+        max_workers : int
+            maximum number of requests that are performed at the same time
+        global_rate_limit : float or None
+            maximum number of requests per second of the whole process, over all the sources
+        per_source_rate_limit : float or None
+            maximum number of requests per second of the whole process towards a single source
+
+        The limits are shared by all the engines of the process, so when the engines are given different
+        limits, the lowest one is kept
+        """
+        self.max_workers = max(1, max_workers)
+        self.global_limiter = GLOBAL_LIMITER
+        self.global_limiter.restrict(global_rate_limit)
+        self.per_source_rate_limit = per_source_rate_limit
+        # The limiters of the sources are created on the first request,
+        # when the names of the sources are known
+        self.source_limiters = {}
+
+    def get_source_limiter(self, source_name):
+        """
+        Returns the limiter of the source, shared by all the engines of the process
+        """
+        limiter = self.source_limiters.get(source_name)
+        if limiter is None:
+            with LIMITERS_LOCK:
+                if source_name not in SOURCE_LIMITERS:
+                    SOURCE_LIMITERS[source_name] = RateLimiter()
+                limiter = SOURCE_LIMITERS[source_name]
+            limiter.restrict(self.per_source_rate_limit)
+            self.source_limiters[source_name] = limiter
+        return limiter
+
+    def call(self, source_name, function, *args):
+        """
+        Performs a single request once both the global and the per-source rate limits allow it,
+        the tasks without a source_name are not requests and are run right away
+        """
+        if source_name is not None:
+            self.global_limiter.acquire()
+            self.get_source_limiter(source_name).acquire()
+        return function(*args)
+
+    def run(self, tasks):
+        """
+        Parameters
+        ----------
+        tasks : list
+            the list contains tuples (source_name, function, args) where args is a tuple
+            with the arguments the function is called with
+
+        Returns
+        ----------
+        results : list
+            the results of the tasks, in the same order as the tasks were given,
+            no matter the order in which the requests finished
+        """
+        return list(self.iter_run(tasks))
+
+    def iter_run(self, tasks):
+        """
+        Generator that yields the results of the tasks in the order the tasks were given, each result
+        being yielded as soon as it is available while the following requests are still running
+        """
+        if len(tasks) == 0:
+            return
+        if self.max_workers == 1 or len(tasks) == 1:
+            for source_name, function, args in tasks:
+                yield self.call(source_name, function, *args)
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            futures = [executor.submit(self.call, source_name, function, *args)
+                       for source_name, function, args in tasks]
+            for future in futures:
+                yield future.result()
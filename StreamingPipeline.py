@@ -0,0 +1,171 @@
+import threading
+from queue import Queue
+
+from TweetAccumulator import TweetAccumulator, TWEET_COLUMNS
+
+import warnings
+warnings.filterwarnings("ignore")
+
+# Marks the end of the stream of batches
+END_OF_STREAM = None
+
+
+class StreamingPipeline:
+    def __init__(
+            self,
+            scrapper,
+            preprocessor,
+            prediction_model,
+            erep_calc,
+            batch_size=32,
+            queue_size=8):
+        """
+        Class that runs the scrapping, the preprocessing and the labeling of the tweets at the same time,
+        the tweets flowing between the stages in bounded batches
+        Parameters
+        ----------
+        scrapper : TweetScrapper object
+        preprocessor : TweetPreprocessor object
+        prediction_model : Model object
+        erep_calc : EReputationCalculator object
+        batch_size : int
+            number of tweets sent at once from a stage to the next one
+        queue_size : int
+            maximum number of batches waiting between two stages
+        """
+        self.scrapper = scrapper
+        self.preprocessor = preprocessor
+        self.prediction_model = prediction_model
+        self.erep_calc = erep_calc
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+    def run_stage(self, function, input_queue, output_queue, errors):
+        """
+        Applies function on every batch from input_queue and puts the result in output_queue
+        """
+        try:
+            while True:
+                batch = input_queue.get()
+                if batch is END_OF_STREAM:
+                    break
+                output_queue.put(function(batch))
+        except Exception as e:
+            errors.append(e)
+            # The remaining batches are consumed so that the previous stage
+            # does not remain blocked
+            while input_queue.get() is not END_OF_STREAM:
+                pass
+        output_queue.put(END_OF_STREAM)
+
+    def scrap(self, comp, output_queue, errors):
+        try:
+            batch = []
+            for ith_tweet in self.scrapper.iter_tweets(comp):
+                batch.append(ith_tweet)
+                if len(batch) == self.batch_size:
+                    output_queue.put(batch)
+                    batch = []
+            if len(batch) > 0:
+                output_queue.put(batch)
+        except Exception as e:
+            errors.append(e)
+        output_queue.put(END_OF_STREAM)
+
+    def preprocess(self, batch):
+        """
+        Returns
+        ----------
+        tuple : (raw tweets, processed tweets) where a processed tweet has its 'Tweet' value replaced
+            by the list of tokens returned by the preprocessor
+        """
+        tweet_index = TWEET_COLUMNS.index('Tweet')
+        id_index = TWEET_COLUMNS.index('Id')
+        # The whole batch is preprocessed at once, the tweets preprocessed by
+        # a previous analysis being read from the cache of the preprocessor
+        processed_lists = self.preprocessor.preprocess_tweets_with_cache(
+            [ith_tweet[tweet_index] for ith_tweet in batch],
+            [ith_tweet[id_index] for ith_tweet in batch])
+        processed_batch = []
+        for ith_tweet, processed_list in zip(batch, processed_lists):
+            processed_tweet = list(ith_tweet)
+            processed_tweet[tweet_index] = processed_list
+            processed_batch.append(processed_tweet)
+        return batch, processed_batch
+
+    def predict(self, batches):
+        """
+        Labels the processed tweets of the batch
+        """
+        batch, processed_batch = batches
+        tweet_index = TWEET_COLUMNS.index('Tweet')
+        label_index = TWEET_COLUMNS.index('Label')
+        labels, confidence_scores = self.prediction_model.predict_batch(
+            [' '.join(processed_tweet[tweet_index]) for processed_tweet in processed_batch])
+        for processed_tweet, label, confidence_score in zip(
+                processed_batch, labels[:, 0], confidence_scores[:, 0]):
+            processed_tweet[label_index] = self.erep_calc.get_label(
+                label, confidence_score, processed_tweet[tweet_index])
+        return batch, processed_batch
+
+    def run(self, comp, my_dates):
+        """
+        Parameters
+        ----------
+        comp : Company object
+        my_dates : list
+            the months of the analysing period, as returned by EReputationCalculator.get_monthly_dates
+
+        Returns
+        ----------
+        tuple : (df_raw, df, scores)
+            df_raw : pandas.DataFrame with the tweets as they were scrapped
+            df : pandas.DataFrame with the preprocessed and labeled tweets
+            scores : list, the e-reputation matrix of the company (see EReputationCalculator.get_e_reputation)
+        """
+        scrapped_queue = Queue(self.queue_size)
+        preprocessed_queue = Queue(self.queue_size)
+        labeled_queue = Queue(self.queue_size)
+        errors = []
+        threads = [
+            threading.Thread(
+                target=self.scrap, args=(comp, scrapped_queue, errors)),
+            threading.Thread(
+                target=self.run_stage,
+                args=(self.preprocess, scrapped_queue, preprocessed_queue, errors)),
+            threading.Thread(
+                target=self.run_stage,
+                args=(self.predict, preprocessed_queue, labeled_queue, errors))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        # The e-reputation is aggregated as the labeled tweets arrive
+        raw_accumulator = TweetAccumulator()
+        processed_accumulator = TweetAccumulator()
+        weights = {}
+        weights_sum = {}
+        month_index = TWEET_COLUMNS.index('Month')
+        label_index = TWEET_COLUMNS.index('Label')
+        influence_index = TWEET_COLUMNS.index('Influence Score')
+        while True:
+            batches = labeled_queue.get()
+            if batches is END_OF_STREAM:
+                break
+            batch, processed_batch = batches
+            for ith_tweet, processed_tweet in zip(batch, processed_batch):
+                raw_accumulator.append(ith_tweet)
+                processed_accumulator.append(processed_tweet)
+                self.erep_calc.add_to_weights(
+                    weights,
+                    weights_sum,
+                    processed_tweet[month_index],
+                    processed_tweet[label_index],
+                    processed_tweet[influence_index])
+        for thread in threads:
+            thread.join()
+        if len(errors) > 0:
+            raise errors[0]
+
+        scores = self.erep_calc.get_scores(weights, weights_sum, my_dates)
+        return raw_accumulator.to_dataframe(), processed_accumulator.to_dataframe(), scores
@@ -0,0 +1,74 @@
+from LRUCache import LRUCache, MISSING
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class TokenNormalizer:
+    def __init__(self, preprocessor, cache_size=100000):
+        """
+        Class that remembers how the tokens were normalized by the preprocessor, so that every distinct token
+        goes through the abbreviations, the diacritics, the extra letters, the CamelCase splitting and
+        the stemming only once
+        Parameters
+        ----------
+        preprocessor : TweetPreprocessor object
+            the preprocessor whose process_raw_token and process_token results are remembered
+        cache_size : int
+            maximum number of tokens remembered for each of the two stages
+        """
+        self.preprocessor = preprocessor
+        self.raw_token_cache = LRUCache(cache_size)
+        self.token_cache = LRUCache(cache_size)
+
+    def normalize_raw_token(self, token):
+        """
+        Returns the tuple (piece, token) computed by TweetPreprocessor.process_raw_token for a token of the cleaned text
+        """
+        result = self.raw_token_cache.get(token)
+        if result is MISSING:
+            result = self.preprocessor.process_raw_token(token)
+            self.raw_token_cache.put(token, result)
+        return result
+
+    def normalize_token(self, token):
+        """
+        Returns the words computed by TweetPreprocessor.process_token for a token of the tokenized text
+        """
+        result = self.token_cache.get(token)
+        if result is MISSING:
+            result = tuple(self.preprocessor.process_token(token))
+            self.token_cache.put(token, result)
+        return result
+
+    def normalize_raw_tokens(self, tokens):
+        """
+        Parameters
+        ----------
+        tokens : iterable
+            the distinct tokens of a batch of cleaned texts
+
+        Returns
+        ----------
+        results : dict
+            maps every token to the result of normalize_raw_token; the dictionary keeps the results
+            of the whole batch even when they do not fit in the cache
+        """
+        return {token: self.normalize_raw_token(token) for token in tokens}
+
+    def normalize_tokens(self, tokens):
+        """
+        Same as normalize_raw_tokens, for the tokens of the tokenized texts
+        """
+        return {token: self.normalize_token(token) for token in tokens}
+
+    def get_stats(self):
+        """
+        Returns
+        ----------
+        stats : dict
+            the statistics of the caches of the two stages, as returned by LRUCache.get_stats
+        """
+        return {
+            'raw_tokens': self.raw_token_cache.get_stats(),
+            'tokens': self.token_cache.get_stats()}
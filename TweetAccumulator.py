@@ -0,0 +1,89 @@
+from array import array
+
+import pandas as pd
+
+import warnings
+warnings.filterwarnings("ignore")
+
+TWEET_COLUMNS = [
+    'Company',
+    'Industry',
+    'Id',
+    'Tweet',
+    'Year',
+    'Month',
+    'Date',
+    'No. Of Retweets',
+    'No. Of Favorites',
+    'Influence Score',
+    'Label']
+
+# The columns that always hold integers are kept in typed buffers
+INTEGER_COLUMNS = {
+    'Year',
+    'No. Of Retweets',
+    'No. Of Favorites',
+    'Influence Score'}
+
+
+class TweetAccumulator:
+    def __init__(self):
+        """
+        Class used for collecting the scrapped tweets column by column, the dataframe being built only once at the end
+        """
+        self.columns = {}
+        for column in TWEET_COLUMNS:
+            if column in INTEGER_COLUMNS:
+                self.columns[column] = array('q')
+            else:
+                self.columns[column] = []
+
+    def __len__(self):
+        return len(self.columns['Id'])
+
+    def append(self, ith_tweet):
+        """
+        Parameters
+        ----------
+        ith_tweet : list
+            the values of the tweet, in the order given by TWEET_COLUMNS
+
+        All the values are checked before any of them is stored, so a tweet with a missing value or with a value
+        that does not fit its typed buffer raises an error and leaves the columns aligned
+        """
+        if len(ith_tweet) != len(TWEET_COLUMNS):
+            raise ValueError("A tweet must have " + str(len(TWEET_COLUMNS)) + " values, not " + str(len(ith_tweet)))
+        values = []
+        for column, value in zip(TWEET_COLUMNS, ith_tweet):
+            if column in INTEGER_COLUMNS:
+                # The value is converted the same way as by the typed buffer,
+                # which raises TypeError or OverflowError
+                value = array('q', [value])[0]
+            values.append(value)
+        for column, value in zip(TWEET_COLUMNS, values):
+            self.columns[column].append(value)
+
+    def extend(self, other):
+        """
+        Appends all the tweets stored by another TweetAccumulator
+        """
+        for column in TWEET_COLUMNS:
+            self.columns[column].extend(other.columns[column])
+
+    def column(self, column):
+        return self.columns[column]
+
+    def to_dataframe(self):
+        """
+        Returns
+        ----------
+        dataframe : pandas.DataFrame
+            dataframe with the columns given by TWEET_COLUMNS
+        """
+        data = {}
+        for column in TWEET_COLUMNS:
+            if column in INTEGER_COLUMNS:
+                data[column] = pd.Series(self.columns[column], dtype='int64')
+            else:
+                data[column] = pd.Series(self.columns[column], dtype='object')
+        return pd.DataFrame(data, columns=TWEET_COLUMNS)
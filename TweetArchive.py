@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import threading
+from datetime import date
+
+from TweetAccumulator import TweetAccumulator
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class TweetArchive:
+    def __init__(self, path):
+        """
+        Class that keeps on disk every tweet that was scrapped, partitioned by company and month,
+        so that the months that were completely scrapped before are not requested again from Twitter
+        Parameters
+        ----------
+        path : string
+            path of the SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS tweets ("
+                "company TEXT, month TEXT, day TEXT, id INTEGER, tweet TEXT, year INTEGER, date TEXT, "
+                "retweets INTEGER, favorites INTEGER, influence_score INTEGER, "
+                "language TEXT, kept INTEGER, PRIMARY KEY (company, id))")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS tweets_partition ON tweets (company, month)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS partitions ("
+                "company TEXT, month TEXT, fetched_at TEXT, PRIMARY KEY (company, month))")
+
+    def get_complete_months(self, company):
+        """
+        Returns
+        ----------
+        months : set
+            the months (in the format 'YYYY-MM') for which all the tweets about the company are in the archive
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT month FROM partitions WHERE company = ?", (company,)).fetchall()
+        return set(row[0] for row in rows)
+
+    def mark_complete_months(self, company, months):
+        fetched_at = date.today().strftime("%Y-%m-%d")
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO partitions VALUES (?, ?, ?)",
+                [(company, month, fetched_at) for month in months])
+
+    def store_tweets(self, company, rows):
+        """
+        Parameters
+        ----------
+        company : string
+        rows : list
+            the list contains tuples (month, day, id, tweet, year, date, retweets, favorites,
+            influence_score, language, kept) for every tweet that went through the language filter,
+            day being the date of the tweet in the format 'YYYY-MM-DD'
+        """
+        if len(rows) == 0:
+            return
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO tweets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(company,) + tuple(row) for row in rows])
+
+    def get_ids(self, company):
+        """
+        Returns the ids of all the archived tweets about the company, kept or not
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id FROM tweets WHERE company = ?", (company,)).fetchall()
+        return [row[0] for row in rows]
+
+    def load_tweets(self, comp):
+        """
+        Parameters
+        ----------
+        comp : Company object
+
+        Returns
+        ----------
+        accumulator : TweetAccumulator
+            the kept tweets about the company that were tweeted in the analysing period
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, tweet, year, month, date, retweets, favorites, influence_score "
+                "FROM tweets WHERE company = ? AND kept = 1 AND day >= ? AND day <= ? "
+                "ORDER BY id",
+                (comp.company, comp.start_date, comp.end_date)).fetchall()
+        accumulator = TweetAccumulator()
+        for id, text, year, month, tweet_date, retweets, favorites, influence_score in rows:
+            accumulator.append([
+                comp.company,
+                comp.industry,
+                id,
+                text,
+                year,
+                month,
+                tweet_date,
+                retweets,
+                favorites,
+                influence_score,
+                '#'])
+        return accumulator
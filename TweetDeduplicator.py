@@ -0,0 +1,121 @@
+import os
+import re
+import hashlib
+
+import numpy as np
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class SeenTweetStore:
+    def __init__(self, path):
+        """
+        Class that keeps on disk the ids of the tweets that were already stored, as a sorted int64 array
+        Parameters
+        ----------
+        path : string
+            path of the .npy file that holds the ids
+        """
+        self.path = path
+        if os.path.exists(path):
+            self.ids = np.load(path)
+        else:
+            self.ids = np.array([], dtype=np.int64)
+        self.new_ids = set()
+
+    def __contains__(self, tweet_id):
+        if tweet_id in self.new_ids:
+            return True
+        position = np.searchsorted(self.ids, tweet_id)
+        return position < len(self.ids) and self.ids[position] == tweet_id
+
+    def __len__(self):
+        return len(self.ids) + len(self.new_ids)
+
+    def add(self, tweet_id):
+        if tweet_id not in self:
+            self.new_ids.add(tweet_id)
+
+    def save(self):
+        """
+        Merges the ids added during this run into the sorted array and writes it on disk
+        """
+        if len(self.new_ids) == 0:
+            return
+        new_ids = np.array(sorted(self.new_ids), dtype=np.int64)
+        self.ids = np.union1d(self.ids, new_ids)
+        self.new_ids = set()
+        directory = os.path.dirname(self.path)
+        if directory != "" and not os.path.exists(directory):
+            os.makedirs(directory)
+        np.save(self.path, self.ids)
+
+
+class TweetDeduplicator:
+    def __init__(self, seen_store=None, use_text_hash=False):
+        """
+        Class used for eliminating the tweets that were already processed
+        Parameters
+        ----------
+        seen_store : SeenTweetStore or None
+            store with the ids of the tweets kept in the previous runs
+        use_text_hash : bool
+            if True, two tweets having the same normalized text are considered duplicates even if their ids differ
+        """
+        self.seen_store = seen_store
+        self.use_text_hash = use_text_hash
+        self.seen_ids = set()
+        self.seen_text_hashes = set()
+
+    def normalized_text_hash(self, text):
+        """
+        Parameters
+        ----------
+        text : string
+
+        Returns
+        ----------
+        int : hash of the text after lowercasing it and collapsing the whitespaces
+        """
+        text = re.sub('\\s+', ' ', text.lower()).strip()
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little', signed=True)
+
+    def is_duplicate(self, tweet_id, text):
+        """
+        Checks whether the tweet was already seen and marks it as seen
+
+        Parameters
+        ----------
+        tweet_id : int
+        text : string
+
+        Returns
+        ----------
+        bool : True if the tweet was seen before, either during this run or in a previous one
+        """
+        if tweet_id in self.seen_ids:
+            return True
+        if self.seen_store is not None and tweet_id in self.seen_store:
+            return True
+        self.seen_ids.add(tweet_id)
+        if self.use_text_hash:
+            text_hash = self.normalized_text_hash(text)
+            if text_hash in self.seen_text_hashes:
+                return True
+            self.seen_text_hashes.add(text_hash)
+        return False
+
+    def add_known_ids(self, tweet_ids):
+        """
+        Marks as seen the tweets that are already held, for example the ones loaded from a previous run
+        """
+        self.seen_ids.update(int(tweet_id) for tweet_id in tweet_ids)
+
+    def mark_as_kept(self, tweet_id):
+        """
+        Records in the persistent store a tweet that was kept, so that it is not ingested again in the next runs
+        """
+        if self.seen_store is not None:
+            self.seen_store.add(tweet_id)
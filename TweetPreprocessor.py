@@ -5,6 +5,10 @@ import string
 import re
 import nltk
 import copy
+import json
+import hashlib
+import threading
+import multiprocessing
 from nltk.tokenize import word_tokenize
 from nltk.stem import SnowballStemmer
 from itertools import chain, combinations
@@ -12,9 +16,64 @@ from itertools import chain, combinations
 import numpy as np
 import pandas as pd
 
+from LexiconIndex import LexiconIndex
+from WordTrie import WordTrie
+from TokenNormalizer import TokenNormalizer
+from NormalizationEngine import NormalizationEngine
+from LexiconRegistry import SHARED_LEXICON_REGISTRY
+from PreprocessingCache import PreprocessingCache, PREPROCESSING_VERSION
+
 import warnings
 warnings.filterwarnings("ignore")
 
+# The substitutions made by clean_text_by_passes, fused in a single pass: the
+# url's, which are removed before the digits, the runs of characters that
+# start with '@' or with 'http' (possibly written with digits inside it),
+# which are cleaned like the whole text, the # and the digits
+CLEAN_TEXT_PATTERN = re.compile(
+    '(?P<url>www\\.\\S+|https?://\\S+|http?://\\S+)|(?P<run>h\\d*t\\d*t\\d*p\\S+|@\\S+)|(?P<hash>#)|\\d+')
+PUNCTUATION_PATTERN = re.compile('[\\W]+')
+# The words that nltk.word_tokenize splits in two, after their first 3 letters
+SPLIT_WORDS = {'cannot', 'gimme', 'gonna', 'gotta', 'lemme', 'wanna'}
+
+# Maps the name of every lexicon of the registry to the argument of
+# TweetPreprocessor that replaces it
+LEXICON_ARGUMENTS = {
+    'stop_words': 'customs_sws',
+    'multiple_vowel_words': 'multiple_vowel_words_set',
+    'abbreviations': 'abbrev_dict',
+    'emoji_dict': 'emoji_dict',
+    'cities': 'cities_list',
+    'companies': 'companies_list'}
+
+# The pools of worker processes of preprocess_dataframe, kept for the whole
+# process and mapped by the number of processes and the configuration of the
+# preprocessors of their workers
+WORKER_POOLS = {}
+WORKER_POOLS_LOCK = threading.Lock()
+# Preprocessor of a worker process, created once when the worker starts
+WORKER_PREPROCESSOR = None
+
+
+def get_worker_context():
+    """
+    Returns the multiprocessing context of the worker processes; they are never forked from this process, whose
+    threads may hold locks (of the caches, the sqlite connections or the logging) at the moment of the fork,
+    but from a server process started without threads ("forkserver"), or from new interpreters ("spawn")
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def init_worker(arguments):
+    global WORKER_PREPROCESSOR
+    WORKER_PREPROCESSOR = TweetPreprocessor(**arguments)
+
+
+def preprocess_chunk(texts):
+    return WORKER_PREPROCESSOR.preprocess_tweets(texts)
+
 
 class TweetPreprocessor:
     def __init__(
@@ -26,7 +85,15 @@ class TweetPreprocessor:
             cities_list=None,
             multiple_vowel_words_set=None,
             companies_list=None,
-            allow_stemming=True):
+            allow_stemming=True,
+            use_lexicon_index=True,
+            use_word_trie=True,
+            token_cache_size=100000,
+            processes=1,
+            chunk_size=64,
+            lexicon_registry=None,
+            cache_path=None,
+            tokenizer="regex"):
         """
         Class used in for preprocessing the tweets
         Parameters
@@ -43,88 +110,199 @@ class TweetPreprocessor:
             list of strings
         multiple_vowel_words_set : dict
             set containing the words in Romanian that contain duplicated vowels
+        use_lexicon_index : bool
+            if True, the lexicons are searched through a LexiconIndex instead of being scanned for every token
+        use_word_trie : bool
+            if True, the extra letters are eliminated by walking a trie of the words with multiple vowels
+            instead of trying every combination of removed letters
+        token_cache_size : int or None
+            maximum number of normalized tokens kept in memory by the TokenNormalizer; if None,
+            every token is normalized again every time it is found
+        processes : int
+            number of processes used by preprocess_dataframe; the pool of worker processes is started
+            by the first call and reused by all the preprocessors of the process with the same configuration
+        chunk_size : int
+            number of tweets sent at once to a worker process
+        lexicon_registry : LexiconRegistry or None
+            the registry from which the lexicons that are not given are read, by default the one shared by
+            the whole process
+        cache_path : string or None
+            path of the PreprocessingCache database in which the tokens of the preprocessed tweets are kept
+            between the analyses; if None, the tweets are always preprocessed
+        tokenizer : string
+            "regex" for cleaning the text with a single compiled regex and splitting it on whitespaces,
+            "nltk" for cleaning it with successive substitutions and tokenizing it with nltk.word_tokenize;
+            both give the same tokens
         """
+        self.lexicon_registry = lexicon_registry if lexicon_registry is not None else SHARED_LEXICON_REGISTRY
         self.stemmer = stemmer
-        self.custom_sws = customs_sws if customs_sws is not None else self.read_list_of_stop_words()
-        self.abbrev_dict = abbrev_dict if abbrev_dict is not None else self.read_list_of_common_abbreviations()
-        self.emoji_dict = emoji_dict if emoji_dict is not None else self.read_emoji_dictionary()
-        self.cities_list = cities_list if cities_list is not None else self.read_list_of_cities()
-        self.multiple_vowel_words_set = multiple_vowel_words_set if multiple_vowel_words_set is not None else self.read_list_of_words_with_multiple_vowels()
-        self.companies_list = companies_list if companies_list is not None else self.read_list_of_companies()
         self.allow_stemming = allow_stemming
+        self.tokenizer = tokenizer
+        self.use_lexicon_index = use_lexicon_index
+        self.use_word_trie = use_word_trie
+        self.processes = processes
+        # The arguments from which the worker processes create their own
+        # preprocessors; the lexicons that are not given are read by every
+        # worker from its registry
+        self.worker_arguments = {
+            'stemmer': stemmer,
+            'customs_sws': customs_sws,
+            'abbrev_dict': abbrev_dict,
+            'emoji_dict': emoji_dict,
+            'cities_list': cities_list,
+            'multiple_vowel_words_set': multiple_vowel_words_set,
+            'companies_list': companies_list,
+            'allow_stemming': allow_stemming,
+            'use_lexicon_index': use_lexicon_index,
+            'use_word_trie': use_word_trie,
+            'token_cache_size': token_cache_size,
+            'tokenizer': tokenizer}
+        self.chunk_size = chunk_size
+        self.token_cache_size = token_cache_size
+        self.preprocessing_cache = None
+        if cache_path is not None:
+            self.preprocessing_cache = PreprocessingCache(cache_path)
+        self.lexicons_lock = threading.Lock()
+        self.bind_lexicons()
+        # The workers read the lexicons from their own registries and bind
+        # them again after a reload, so their pool is kept across reloads
+        self.worker_config_hash = self.get_config_hash(self.get_given_lexicons(), registry_fingerprints=False)
+
+    def get_given_lexicons(self):
+        """
+        Returns a dict that maps the name of every lexicon to the value given to the constructor, None if it
+        is read from the registry
+        """
+        return {name: self.worker_arguments[argument] for name, argument in LEXICON_ARGUMENTS.items()}
 
-    def read_list_of_stop_words(self):
-        path = ""
-        print(str(os.getcwd()))
-        if "Brand-analysis-master" not in str(os.getcwd()):
-            path = "Brand-analysis-master/Data/Custom stop-words and emojis/custom_stop_words_list.npy"
+    def get_registry_fingerprints(self):
+        """
+        Returns the fingerprints of the lexicons read from the registry, which change when the registry
+        reloads one of them
+        """
+        return [self.lexicon_registry.get_fingerprint_of(name)
+                for name, lexicon in self.get_given_lexicons().items() if lexicon is None]
+
+    def bind_lexicons(self):
+        """
+        Reads the lexicons that were not given to the constructor from the registry and builds everything that
+        depends on them; the tokens normalized with the previous lexicons are forgotten
+        """
+        given = self.get_given_lexicons()
+        self.registry_fingerprints = self.get_registry_fingerprints()
+        self.custom_sws = given['stop_words'] if given['stop_words'] is not None else self.read_list_of_stop_words()
+        self.abbrev_dict = given['abbreviations'] if given['abbreviations'] is not None else self.read_list_of_common_abbreviations()
+        self.emoji_dict = given['emoji_dict'] if given['emoji_dict'] is not None else self.read_emoji_dictionary()
+        self.cities_list = given['cities'] if given['cities'] is not None else self.read_list_of_cities()
+        self.multiple_vowel_words_set = given['multiple_vowel_words'] if given['multiple_vowel_words'] is not None else self.read_list_of_words_with_multiple_vowels()
+        self.companies_list = given['companies'] if given['companies'] is not None else self.read_list_of_companies()
+        self.lexicon_index = None
+        if self.use_lexicon_index:
+            if given['stop_words'] is None and given['cities'] is None and given['companies'] is None:
+                # The index of the lexicons from the registry is built once
+                # for the whole process
+                self.lexicon_index = self.lexicon_registry.get_derived(
+                    'lexicon_index', ['companies', 'cities', 'stop_words'], LexiconIndex)
+            else:
+                self.lexicon_index = LexiconIndex(
+                    self.companies_list, self.cities_list, self.custom_sws)
+        self.multiple_vowel_words_trie = None
+        if self.use_word_trie:
+            if given['multiple_vowel_words'] is None:
+                self.multiple_vowel_words_trie = self.lexicon_registry.get_derived(
+                    'word_trie', ['multiple_vowel_words'], WordTrie)
+            else:
+                self.multiple_vowel_words_trie = WordTrie(self.multiple_vowel_words_set)
+        if given['abbreviations'] is None and given['emoji_dict'] is None:
+            self.normalization_engine = self.lexicon_registry.get_derived(
+                'normalization_engine', ['abbreviations', 'emoji_dict'], NormalizationEngine)
         else:
-            path = "Data/Custom stop-words and emojis/custom_stop_words_list.npy"
-        custom_sws = np.load(path, allow_pickle=True)
+            self.normalization_engine = NormalizationEngine(self.abbrev_dict, self.emoji_dict)
+        self.token_normalizer = None
+        if self.token_cache_size is not None:
+            self.token_normalizer = TokenNormalizer(self, self.token_cache_size)
+        self.config_hash = self.get_config_hash(given)
 
-        return custom_sws
+    def refresh_lexicons(self):
+        """
+        Binds the lexicons again when the registry reloaded one of the lexicons read from it, so that the
+        preprocessors already created never keep the old lexicons nor the tokens normalized with them
+        """
+        if self.get_registry_fingerprints() == self.registry_fingerprints:
+            return
+        with self.lexicons_lock:
+            if self.get_registry_fingerprints() != self.registry_fingerprints:
+                self.bind_lexicons()
 
-    def read_list_of_words_with_multiple_vowels(self):
-        path = ""
-        if "Brand-analysis-master" not in str(os.getcwd()):
-            path = "Brand-analysis-master/Data/Romanian words with their lemma's/multiple_vowel_words_rom_lang.txt"
+    def get_lexicon_fingerprint(self, lexicon):
+        """
+        Returns the hash of the content of a lexicon given to the preprocessor
+        """
+        if isinstance(lexicon, np.ndarray) and lexicon.shape == ():
+            lexicon = lexicon[()]
+        if hasattr(lexicon, 'items'):
+            entries = sorted([str(key) + "=" + str(value) for key, value in lexicon.items()])
         else:
-            path = "Data/Romanian words with their lemma's/multiple_vowel_words_rom_lang.txt"
-        multiple_vowel_words_set = set()
-        with open(path, encoding='utf-8', mode="r") as f:
-            lines = f.readlines()
-            for line in lines:
-                multiple_vowel_words_set.add(line[:-1])
-        return multiple_vowel_words_set
+            entries = sorted([str(entry) for entry in lexicon])
+        return hashlib.blake2b("\n".join(entries).encode('utf-8'), digest_size=16).hexdigest()
+
+    def get_stemmer_description(self):
+        """
+        Returns a string that changes with the class of the stemmer, with its language (nltk's SnowballStemmer
+        keeps the stemmer of the language in its stemmer attribute) and with the stop-words it does not stem
+        """
+        stemmer = getattr(self.stemmer, 'stemmer', self.stemmer)
+        stopwords = sorted(getattr(stemmer, 'stopwords', []))
+        return type(self.stemmer).__name__ + ":" + type(stemmer).__name__ + ":" + ",".join(stopwords)
+
+    def get_config_hash(self, given_lexicons, registry_fingerprints=True):
+        """
+        Parameters
+        ----------
+        given_lexicons : dict
+            maps the name of every lexicon to the value given to the constructor, None if it was read from the registry
+        registry_fingerprints : bool
+            if False, the lexicons read from the registry are hashed by their names only, so the hash does not
+            change when the registry reloads them
+
+        Returns
+        ----------
+        config_hash : string
+            hash of everything that decides the tokens returned by the preprocessor
+        """
+        config = {
+            'version': PREPROCESSING_VERSION,
+            'allow_stemming': self.allow_stemming,
+            'stemmer': self.get_stemmer_description(),
+            # The tokenizers and the structures of the lexicons give the same
+            # tokens, but the tokens they produce are never mixed in the cache
+            'tokenizer': self.tokenizer,
+            'use_lexicon_index': self.use_lexicon_index,
+            'use_word_trie': self.use_word_trie}
+        for name, lexicon in given_lexicons.items():
+            if lexicon is None:
+                config[name] = self.lexicon_registry.get_fingerprint_of(name) if registry_fingerprints else "registry"
+            else:
+                config[name] = self.get_lexicon_fingerprint(lexicon)
+        return hashlib.blake2b(json.dumps(config, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+    def read_list_of_stop_words(self):
+        return self.lexicon_registry.get('stop_words')
+
+    def read_list_of_words_with_multiple_vowels(self):
+        return self.lexicon_registry.get('multiple_vowel_words')
 
     def read_list_of_common_abbreviations(self):
-        path = ""
-        if "Brand-analysis-master" not in str(os.getcwd()):
-            path = "Brand-analysis-master/Data/Custom stop-words and emojis/common_abbreviations_ro.txt"
-        else:
-            path = "Data/Custom stop-words and emojis/common_abbreviations_ro.txt"
-
-        abbrev_dict = {}
-        with open(path, "r") as f:
-            lines = f.readlines()
-            for line in lines:
-                words = line.split("=")
-                if len(words) == 1:
-                    break
-                words[0] = " " + words[0]
-                words[1] = words[1][:-1] + " "
-                abbrev_dict[words[0]] = words[1]
-        return abbrev_dict
+        return self.lexicon_registry.get('abbreviations')
 
     def read_emoji_dictionary(self):
-        path = ""
-        if "Brand-analysis-master" not in str(os.getcwd()):
-            path = "Brand-analysis-master/Data/Custom stop-words and emojis/emoji_dict.npy"
-        else:
-            path = "Data/Custom stop-words and emojis/emoji_dict.npy"
-
-        emoji_dict = np.load(path, allow_pickle=True)
-        return emoji_dict
+        return self.lexicon_registry.get('emoji_dict')
 
     def read_list_of_cities(self):
-        path = ""
-        if "Brand-analysis-master" not in str(os.getcwd()):
-            path = "Brand-analysis-master/Data/Custom stop-words and emojis/cities_list.npy"
-        else:
-            path = "Data/Custom stop-words and emojis/cities_list.npy"
-        cities_list = np.load(path, allow_pickle=True)
-        return cities_list
+        return self.lexicon_registry.get('cities')
 
     def read_list_of_companies(self):
-        path = ""
-        if "Brand-analysis-master" not in str(os.getcwd()):
-            path = "Brand-analysis-master/Data/Companies/companies_list.npy"
-        else:
-            path = "Data/Companies/companies_list.npy"
-        global companies_list
-        companies_list = np.load(path, allow_pickle=True)
-
-        return companies_list
+        return self.lexicon_registry.get('companies')
 
     def is_number(self, text):
         for elem in text:
@@ -139,18 +317,7 @@ class TweetPreprocessor:
         return False
 
     def eliminate_diacritics(self, word):
-        word = word.replace("ă", "a")
-        word = word.replace("â", "a")
-        word = word.replace("î", "i")
-        word = word.replace("ț", "t")
-        word = word.replace("ș", "s")
-        word = word.replace("Ă", "A")
-        word = word.replace("Â", "A")
-        word = word.replace("Î", "I")
-        word = word.replace("Ț", "T")
-        word = word.replace("Ș", "S")
-
-        return word
+        return self.normalization_engine.eliminate_diacritics(word)
 
     def remove_at(self, i, s):
         return s[:i] + s[i + 1:]
@@ -189,6 +356,18 @@ class TweetPreprocessor:
 
         return False
 
+    def get_runs(self, word):
+        """
+        Returns the run-length encoding of the word, as a list of tuples (letter, number of repetitions)
+        """
+        runs = []
+        for character in word:
+            if len(runs) > 0 and runs[-1][0] == character:
+                runs[-1] = (character, runs[-1][1] + 1)
+            else:
+                runs.append((character, 1))
+        return runs
+
     def eliminate_extra_letters(self, word):
         """
         Parameters
@@ -231,6 +410,15 @@ class TweetPreprocessor:
             i += 1
         if word in self.multiple_vowel_words_set:
             return word
+        if self.multiple_vowel_words_trie is not None:
+            # The trie gives the same word as the search below, which tries
+            # the combinations with fewer removed letters first
+            runs = self.get_runs(word)
+            removals = self.multiple_vowel_words_trie.find_reduction(runs)
+            if removals is not None:
+                return ''.join([character * (length - removed)
+                                for (character, length), removed in zip(runs, removals)])
+            return ''.join([character for character, length in runs])
         positions = [0] * len(word)
         counter = 1
         positions[0] = counter
@@ -266,6 +454,43 @@ class TweetPreprocessor:
     def compare_ignore_case(self, a, b):
         return a.lower() in b.lower()
 
+    def contains_company(self, token):
+        if self.lexicon_index is not None:
+            return self.lexicon_index.contains_company(token)
+        for comp in self.companies_list:
+            if self.compare_ignore_case(comp, token):
+                return True
+        return False
+
+    def is_part_of_city(self, token):
+        if self.lexicon_index is not None:
+            return self.lexicon_index.is_part_of_city(token)
+        for city in self.cities_list:
+            if self.compare_ignore_case(token, city):
+                return True
+        return False
+
+    def is_part_of_company(self, token):
+        if self.lexicon_index is not None:
+            return self.lexicon_index.is_part_of_company(token)
+        for comp in self.companies_list:
+            if self.compare_ignore_case(token, comp):
+                return True
+        return False
+
+    def is_part_of_stop_word(self, token):
+        if self.lexicon_index is not None:
+            return self.lexicon_index.is_part_of_stop_word(token)
+        for sw in self.custom_sws:
+            if self.compare_ignore_case(token, sw):
+                return True
+        return False
+
+    def is_stop_word(self, word):
+        if self.lexicon_index is not None:
+            return self.lexicon_index.is_stop_word(word)
+        return word in self.custom_sws
+
     def is_camel_case(self, text):
         """
         Parameters
@@ -326,18 +551,24 @@ class TweetPreprocessor:
 
         return words
 
-    def preprocess_tweet(self, text):
+    def clean_text(self, text):
         """
-        Parameters
-        ----------
-        text : string
-
-        Returns
-        ----------
-        processed_list : list
-            the list contains strings which are obtained after doing the necessary preprocessing before the labelling should take place
+        Returns the text without url's, digits and usernames, in which every # is replaced with a space
         """
-
+        if self.tokenizer == "regex":
+            return CLEAN_TEXT_PATTERN.sub(self.replace_cleaned_match, text)
+        return self.clean_text_by_passes(text)
+
+    def replace_cleaned_match(self, match):
+        if match.group('run') is not None:
+            # The run may contain url's and digits that change what the
+            # successive substitutions remove from it
+            return self.clean_text_by_passes(match.group('run'))
+        if match.group('hash') is not None:
+            return ' '
+        return ''
+
+    def clean_text_by_passes(self, text):
         # remove url's
         text = re.sub(
             '((www\\.[^\\s]+)|(https?://[^\\s]+)|(http?://[^\\s]+))',
@@ -351,102 +582,243 @@ class TweetPreprocessor:
         text = re.sub('@[^\\s]+', '', text)
         # replacing # with space
         text = text.replace("#", ' ')
-        tokens_list = text.split(" ")
-        text = ""
-        for i in range(len(tokens_list)):
-            if " " + tokens_list[i].lower() + " " in self.abbrev_dict.keys():
-                tokens_list[i] = self.abbrev_dict[" " +
-                                                  tokens_list[i].lower() + " "]
-            tokens_list[i] = self.eliminate_diacritics(tokens_list[i])
-            is_company = False
-            for comp in companies_list:
-                if self.compare_ignore_case(comp, tokens_list[i]):
-                    is_company = True
-                    break
-            if self.has_extra_letters(tokens_list[i].lower()):
-                if not is_company:
-                    tokens_list[i] = self.eliminate_extra_letters(
-                        tokens_list[i].lower())
-            if is_company == False and self.is_camel_case(
-                    tokens_list[i]) == True:
-                splitted_words = self.get_words_from_camel_case(tokens_list[i])
-                for new_word in splitted_words:
-                    if " " + new_word.lower() + " " in self.abbrev_dict.keys():
-                        new_word = self.abbrev_dict[" " +
-                                                    new_word.lower() + " "]
-                    text += new_word
-                    text += " "
-            else:
-                text += tokens_list[i]
-                text += " "
-            try:
-                value = self.emoji_dict[()][tokens_list[i]]
-                text = text.replace(tokens_list[i], value)
-            except BaseException:
-                continue
+        return text
+
+    def process_raw_token(self, token):
+        """
+        Parameters
+        ----------
+        token : string
+            a string of the cleaned text, delimited by spaces
+
+        Returns
+        ----------
+        tuple : (piece, token)
+            piece is the text that replaces the token in the tweet, ending with a space, and token is the
+            token after the abbreviations, the diacritics and the extra letters were handled
+        """
+        abbreviation = self.normalization_engine.get_abbreviation(token.lower())
+        if abbreviation is not None:
+            token = abbreviation
+        token = self.normalization_engine.eliminate_diacritics(token)
+        is_company = self.contains_company(token)
+        if self.has_extra_letters(token.lower()):
+            if not is_company:
+                token = self.eliminate_extra_letters(token.lower())
+        if is_company == False and self.is_camel_case(token) == True:
+            pieces = []
+            for new_word in self.get_words_from_camel_case(token):
+                abbreviation = self.normalization_engine.get_abbreviation(new_word.lower())
+                pieces.append(abbreviation if abbreviation is not None else new_word)
+                pieces.append(" ")
+            piece = "".join(pieces)
+        else:
+            piece = token + " "
+        return piece, token
+
+    def join_raw_tokens(self, processed_tokens):
+        """
+        Parameters
+        ----------
+        processed_tokens : list
+            the list contains the tuples (piece, token) returned by process_raw_token for the tokens of a tweet
+
+        Returns
+        ----------
+        text : string
+            the text of the tweet, in which the emoticons were replaced with their labels
+        """
+        return self.normalization_engine.join_pieces(processed_tokens)
+
+    def tokenize(self, text):
+        if self.tokenizer == "regex":
+            # After the punctuation is eliminated, nltk.word_tokenize only
+            # splits the text on whitespaces, and splits a few English words
+            tokens = []
+            for token in PUNCTUATION_PATTERN.sub(' ', text).split():
+                if token.lower() in SPLIT_WORDS:
+                    tokens.append(token[:3])
+                    tokens.append(token[3:])
+                else:
+                    tokens.append(token)
+            return tokens
         # Eliminating any punctuation mark
         text = re.sub('[\\W]+', ' ', text)
         nopunc = [char for char in text]
         # Join the characters again to form the string.
         nopunc = ''.join(nopunc)
         # Tokenizing into a list of tokens
-        nopunc = word_tokenize(nopunc)
+        return word_tokenize(nopunc)
+
+    def process_token(self, token):
+        """
+        Parameters
+        ----------
+        token : string
+            a token of the text returned by join_raw_tokens
+
+        Returns
+        ----------
+        words : list
+            the words that replace the token in the processed tweet, which can be empty
+        """
         # Using Snowball Stemmer for Romanian Language in order to stem the
         # words and convert them to lowercase
-        stemmed_list = []
-        for token in nopunc:
-            should_be_stemmed = True
-            should_be_kept = False
-            if token == 'bun' or token == 'rau':
+        should_be_stemmed = True
+        should_be_kept = False
+        if token == 'bun' or token == 'rau':
+            should_be_stemmed = False
+            should_be_kept = True
+        if should_be_stemmed:
+            if self.is_part_of_city(token):
+                should_be_stemmed = False
+        if should_be_stemmed:
+            if self.is_part_of_company(token):
+                should_be_stemmed = False
+        if should_be_stemmed:
+            if self.is_part_of_stop_word(token):
                 should_be_stemmed = False
                 should_be_kept = True
-            if should_be_stemmed:
-                for city in self.cities_list:
-                    if self.compare_ignore_case(token, city):
-                        should_be_stemmed = False
-                        break
-            if should_be_stemmed:
-                for comp in companies_list:
-                    if self.compare_ignore_case(token, comp):
-                        should_be_stemmed = False
-                        break
-            if should_be_stemmed:
-                for sw in self.custom_sws:
-                    if self.compare_ignore_case(token, sw):
-                        should_be_stemmed = False
-                        should_be_kept = True
-                        break
-            if should_be_stemmed:
-                if not self.allow_stemming:
-                    stemmed_list.append(token.lower())
-                else:
-                    stemmed_list.append(self.stemmer.stem(token.lower()))
-            elif should_be_stemmed == False and should_be_kept == True:
-                stemmed_list.append(token.lower())
-            elif token.lower() == 'nu':
-                stemmed_list.append('nu')
+        stemmed_word = None
+        if should_be_stemmed:
+            if not self.allow_stemming:
+                stemmed_word = token.lower()
+            else:
+                stemmed_word = self.stemmer.stem(token.lower())
+        elif should_be_stemmed == False and should_be_kept == True:
+            stemmed_word = token.lower()
+        elif token.lower() == 'nu':
+            stemmed_word = 'nu'
+        if stemmed_word is None:
+            return []
 
         replaced_list = []
-        for i in range(len(stemmed_list)):
-            if " " + stemmed_list[i] + " " in self.abbrev_dict.keys():
-                replacement = self.abbrev_dict[" " + stemmed_list[i] + " "]
-                words = [word.strip() for word in replacement.split()]
-                for word in words:
-                    replaced_list.append(word)
-            else:
-                replaced_list.append(stemmed_list[i])
-        processed_list = [
-            word for word in replaced_list if word not in self.custom_sws]
+        replacement = self.normalization_engine.get_abbreviation(stemmed_word)
+        if replacement is not None:
+            words = [word.strip() for word in replacement.split()]
+            for word in words:
+                replaced_list.append(word)
+        else:
+            replaced_list.append(stemmed_word)
+        return [word for word in replaced_list if not self.is_stop_word(word)]
 
+    def normalize_raw_token(self, token):
+        if self.token_normalizer is not None:
+            return self.token_normalizer.normalize_raw_token(token)
+        return self.process_raw_token(token)
+
+    def normalize_token(self, token):
+        if self.token_normalizer is not None:
+            return self.token_normalizer.normalize_token(token)
+        return self.process_token(token)
+
+    def preprocess_tweet(self, text):
+        """
+        Parameters
+        ----------
+        text : string
+
+        Returns
+        ----------
+        processed_list : list
+            the list contains strings which are obtained after doing the necessary preprocessing before the labelling should take place
+        """
+        self.refresh_lexicons()
+        tokens_list = self.clean_text(text).split(" ")
+        text = self.join_raw_tokens(
+            [self.normalize_raw_token(token) for token in tokens_list])
+        processed_list = []
+        for token in self.tokenize(text):
+            processed_list.extend(self.normalize_token(token))
         return processed_list
 
+    def preprocess_tweets(self, texts):
+        """
+        Parameters
+        ----------
+        texts : list
+            list of strings
+
+        Returns
+        ----------
+        processed_lists : list
+            the processed list of every text, as returned by preprocess_tweet; every distinct token of the
+            texts is normalized only once
+        """
+        self.refresh_lexicons()
+        if self.token_normalizer is None:
+            return [self.preprocess_tweet(text) for text in texts]
+        tokens_lists = [self.clean_text(text).split(" ") for text in texts]
+        raw_tokens = self.token_normalizer.normalize_raw_tokens(
+            set(chain.from_iterable(tokens_lists)))
+        tokens_lists = [self.tokenize(self.join_raw_tokens([raw_tokens[token] for token in tokens_list]))
+                        for tokens_list in tokens_lists]
+        tokens = self.token_normalizer.normalize_tokens(
+            set(chain.from_iterable(tokens_lists)))
+        return [list(chain.from_iterable([tokens[token] for token in tokens_list]))
+                for tokens_list in tokens_lists]
+
+    def preprocess_tweets_in_parallel(self, texts):
+        """
+        Same as preprocess_tweets, the texts being split into chunks processed by self.processes worker processes;
+        the processed lists are returned in the order of the texts
+        """
+        if self.processes <= 1 or len(texts) <= self.chunk_size:
+            return self.preprocess_tweets(texts)
+        self.refresh_lexicons()
+        chunks = [texts[i:i + self.chunk_size]
+                  for i in range(0, len(texts), self.chunk_size)]
+        processed_chunks = self.get_worker_pool().map(preprocess_chunk, chunks)
+        return list(chain.from_iterable(processed_chunks))
+
+    def get_worker_pool(self):
+        """
+        Returns the pool of worker processes used by preprocess_tweets_in_parallel, started the first time it is
+        needed; the workers of a pool are started only once for the whole process
+        """
+        key = (self.processes, self.worker_config_hash, self.token_cache_size)
+        with WORKER_POOLS_LOCK:
+            if key not in WORKER_POOLS:
+                WORKER_POOLS[key] = get_worker_context().Pool(
+                    self.processes, initializer=init_worker, initargs=(self.worker_arguments,))
+            return WORKER_POOLS[key]
+
+    def preprocess_tweets_with_cache(self, texts, ids=None):
+        """
+        Parameters
+        ----------
+        texts : list
+            list of strings
+        ids : list or None
+            the ids of the tweets, used as keys of the PreprocessingCache; when not given, the texts are hashed
+
+        Returns
+        ----------
+        processed_lists : list
+            the processed list of every text; only the tweets missing from the PreprocessingCache are
+            preprocessed, and their tokens are added to it
+        """
+        if self.preprocessing_cache is None:
+            return self.preprocess_tweets_in_parallel(texts)
+        self.refresh_lexicons()
+        keys = [self.preprocessing_cache.get_key(texts[i], ids[i] if ids is not None else None)
+                for i in range(len(texts))]
+        processed = self.preprocessing_cache.get_many(keys, self.config_hash)
+        missing = {}
+        for i in range(len(texts)):
+            if keys[i] not in processed and keys[i] not in missing:
+                missing[keys[i]] = texts[i]
+        new_processed = dict(zip(
+            missing.keys(), self.preprocess_tweets_in_parallel(list(missing.values()))))
+        self.preprocessing_cache.put_many(new_processed, self.config_hash)
+        processed.update(new_processed)
+        return [list(processed[key]) for key in keys]
+
     def read_utils(self):
-        self.read_list_of_stop_words()
-        self.read_list_of_words_with_multiple_vowels()
-        self.read_list_of_common_abbreviations()
-        self.read_emoji_dictionary()
-        self.read_list_of_cities()
-        self.read_list_of_companies()
+        # The lexicons are kept by the registry, so they are read from the
+        # disk again, and bound again to the preprocessor, only if their
+        # files were modified
+        self.refresh_lexicons()
 
     def preprocess_dataframe(self, dataframe):
         """
@@ -461,7 +833,12 @@ class TweetPreprocessor:
             the list contains strings which are obtained after doing the necessary preprocessing
         """
         self.read_utils()
-        for i in range(len(dataframe)):
-            dataframe.iloc[i]['Tweet'] = self.preprocess_tweet(
-                dataframe.iloc[i]['Tweet'])
+        # The whole column is replaced at once, the rows returned by iloc
+        # being copies of the dataframe
+        dataframe['Tweet'] = pd.Series(
+            self.preprocess_tweets_with_cache(
+                list(dataframe['Tweet']),
+                list(dataframe['Id']) if 'Id' in dataframe.columns else None),
+            index=dataframe.index,
+            dtype=object)
         return dataframe
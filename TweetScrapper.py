@@ -1,28 +1,273 @@
 import os
-from langdetect import detect
-from time import sleep
-
-import GetOldTweets3 as got
-import pandas as pd
-import numpy as np
+import datetime
 
 import warnings
 
 from Company import Company
+from ScrapingEngine import ScrapingEngine
+from TweetAccumulator import TweetAccumulator, TWEET_COLUMNS
+from TweetDeduplicator import TweetDeduplicator, SeenTweetStore
+from WatermarkStore import WatermarkStore
+from TweetArchive import TweetArchive
+from EReputationCalculator import EReputationCalculator
+from RetryPolicy import RetryPolicy, RetryError
+from TweetSource import TweetQuery, GetOldTweetsSource
+from LanguageIdentifier import SHARED_LANGUAGE_IDENTIFIER
+from QueryPlanner import QueryPlanner
+from CompanyMatcher import CompanyMatcher
 
 warnings.filterwarnings("ignore")
 
 
 class TweetScrapper:
-    def __init__(self, no_of_tweets=100):
+    def __init__(
+            self,
+            no_of_tweets=100,
+            max_workers=8,
+            global_rate_limit=None,
+            per_source_rate_limit=None,
+            seen_store_dir=None,
+            use_text_hash=False,
+            archive_dir=None,
+            retry_policy=None,
+            source=None,
+            language_identifier=None,
+            query_planner=None,
+            shared_industry_stream=False):
         """
         Class used for performing the tweet scrapping task
         Parameters
         ----------
         no_of_tweets : int
             number of tweets that should be scrapped
+        max_workers : int
+            maximum number of queries that are sent to Twitter at the same time
+        global_rate_limit : float or None
+            maximum number of queries per second of all the scrappers of the process, see ScrapingEngine
+        per_source_rate_limit : float or None
+            maximum number of queries per second of all the scrappers of the process towards a single
+            tweet source, see ScrapingEngine
+        seen_store_dir : string or None
+            directory where the ids of the kept tweets are saved for every company; when given,
+            the tweets kept in a previous run are not ingested again, but served from the archive,
+            so archive_dir must also be given
+        use_text_hash : bool
+            if True, the tweets with the same normalized text are considered duplicates
+        archive_dir : string or None
+            directory of the tweet archive; when given, the months that were completely scrapped before
+            are read from the archive, and for the other months only the tweets newer than the
+            watermark of each query are requested from Twitter
+        retry_policy : RetryPolicy or None
+            the policy used for retrying the failed requests, by default a RetryPolicy
+            that uses the circuit breaker shared by the whole process
+        source : TweetSource or None
+            the source of the tweets, by default Twitter through GetOldTweets3
+        language_identifier : LanguageIdentifier or None
+            the object that decides the language of the tweets, by default the one shared by the whole process
+        query_planner : QueryPlanner or None
+            the object that splits the scrapped periods into shards, by default monthly shards
+        shared_industry_stream : bool
+            if True, the tweets about the companies of an industry are requested with a single query
+            stream and every tweet is attributed locally to all the companies it mentions
         """
+        if seen_store_dir is not None and archive_dir is None:
+            # The store only holds the ids, so the tweets it makes the
+            # scrapper skip would be missing from the results
+            raise ValueError("seen_store_dir can only be used together with archive_dir")
         self.no_of_tweets = no_of_tweets
+        self.source = source if source is not None else GetOldTweetsSource()
+        self.language_identifier = language_identifier if language_identifier is not None else SHARED_LANGUAGE_IDENTIFIER
+        self.engine = ScrapingEngine(
+            max_workers,
+            global_rate_limit,
+            per_source_rate_limit)
+        self.seen_store_dir = seen_store_dir
+        self.use_text_hash = use_text_hash
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.erep_calc = EReputationCalculator()
+        self.query_planner = query_planner if query_planner is not None else QueryPlanner()
+        self.shared_industry_stream = shared_industry_stream
+        self.archive = None
+        self.watermark_store = None
+        if archive_dir is not None:
+            self.archive = TweetArchive(os.path.join(archive_dir, "tweets.db"))
+            self.watermark_store = WatermarkStore(archive_dir)
+
+    def get_deduplicator(self, comp):
+        seen_store = None
+        if self.seen_store_dir is not None:
+            seen_store = SeenTweetStore(
+                os.path.join(self.seen_store_dir, comp.company + ".npy"))
+        return TweetDeduplicator(seen_store, self.use_text_hash)
+
+    def build_tweet_query(self, comp, i, since, until, max_tweets, query_search=None):
+        """
+        Parameters
+        ----------
+        comp : Company object
+        i : int
+            0 for the query without location, 1 for the query restricted to Romania
+        since : string
+            the first day for which tweets are requested, has the format "YYYY-MM-DD"
+        until : string
+            the day until which tweets are requested, has the format "YYYY-MM-DD"
+        max_tweets : int
+            the tweet budget of the query
+        query_search : string or None
+            the searched text, by default the name of the company
+
+        Returns
+        ----------
+        query : TweetQuery
+        """
+        if query_search is None:
+            query_search = comp.company
+        query = None
+        if i % 2 == 1:
+            print("location")
+            query = TweetQuery(
+                query_search,
+                since,
+                until,
+                max_tweets,
+                near="Fagaras",
+                within="230" + str(i) + "mi")
+        else:
+            print("no location")
+            query = TweetQuery(
+                query_search,
+                since,
+                until,
+                max_tweets)
+
+        """
+        Fagaras was chosen as the point of reference because
+        the city is located in the geographical center of Romania.
+        Also, 250 miles(around 400 kilometers) is enough in order to cover the whole country.
+        """
+        return query
+
+    def get_tweets(self, query):
+        """
+        Parameters
+        ----------
+        query : TweetQuery
+
+        Returns
+        ----------
+        tweets : list or None
+            the tweets returned by the source, or None if the request failed after all the retries
+            allowed by the retry policy or was refused by the circuit breaker
+        """
+        try:
+            return self.retry_policy.call(self.source.get_tweets, query)
+        except RetryError as e:
+            print("The tweets could not be scrapped: " + str(e))
+            return None
+
+    def get_missing_ranges(self, comp):
+        """
+        Parameters
+        ----------
+        comp : Company object
+
+        Returns
+        ----------
+        ranges : list
+            the list contains tuples (since, until) with the periods that are not completely found
+            in the archive, built by joining the consecutive missing months
+        """
+        if self.archive is None:
+            return [(comp.start_date, comp.end_date)]
+        complete_months = self.archive.get_complete_months(comp.company)
+        ranges = []
+        for month in self.erep_calc.get_monthly_dates(comp):
+            if month in complete_months:
+                continue
+            since = max(month + "-01", comp.start_date)
+            until = min(self.query_planner.get_next_month_start(month), comp.end_date)
+            if len(ranges) > 0 and ranges[-1][1] == since:
+                ranges[-1] = (ranges[-1][0], until)
+            else:
+                ranges.append((since, until))
+        return ranges
+
+    def get_query_since(self, comp, i, since, until):
+        """
+        Parameters
+        ----------
+        comp : Company object
+        i : int
+            the query variant
+        since : string
+        until : string
+            the period that has to be covered by the query
+
+        Returns
+        ----------
+        since : string or None
+            the first day that has to be requested from Twitter, which is the day of the watermark when
+            the tweets already scrapped cover the beginning of the period, or None if the whole period was
+            already covered by the previous queries
+        """
+        if self.watermark_store is None:
+            return since
+        watermark = self.watermark_store.get_watermark(comp.company, i)
+        if watermark is None or watermark['since'] > since:
+            return since
+        if until <= watermark.get('until', watermark['date']):
+            return None
+        return max(watermark['date'], since)
+
+    def plan_queries(self, comp, no_of_tweets=None):
+        """
+        Parameters
+        ----------
+        comp : Company object
+        no_of_tweets : int or None
+            the number of tweets wanted for the company, by default self.no_of_tweets
+
+        Returns
+        ----------
+        plan : tuple
+            (ranges, queries) where ranges are the periods missing from the archive and queries is a list
+            of tuples (i, since, until, max_tweets) with the queries that have to be sent to Twitter
+        """
+        if no_of_tweets is None:
+            no_of_tweets = self.no_of_tweets
+        ranges = self.get_missing_ranges(comp)
+        queries = []
+        # Every missing period is split into monthly shards, each one
+        # having its own tweet budget
+        for since, until, max_tweets in self.query_planner.plan(ranges, no_of_tweets):
+            for i in range(2):
+                query_since = self.get_query_since(comp, i, since, until)
+                if query_since is not None:
+                    queries.append((i, query_since, until, max_tweets - i))
+        return ranges, queries
+
+    def get_fetching_tasks(self, comp, plan, query_search=None):
+        """
+        Returns the tasks (a query without location and one with location for every shard)
+        that have to be run by the scrapping engine for the company comp
+        """
+        ranges, queries = plan
+        return [(self.source.name, self.get_tweets,
+                 (self.build_tweet_query(comp, i, since, until, max_tweets, query_search),))
+                for i, since, until, max_tweets in queries]
+
+    def get_complete_months(self, comp, ranges):
+        """
+        Returns the months that are entirely covered by the scrapped periods and that have already ended
+        """
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        complete_months = []
+        for since, until in ranges:
+            for month in self.erep_calc.get_monthly_dates(Company(comp.company, comp.industry, since, until)):
+                next_month_start = self.query_planner.get_next_month_start(month)
+                if month + "-01" >= since and next_month_start <= until and next_month_start <= today:
+                    complete_months.append(month)
+        return complete_months
 
     def scrap_for_tweets(self, comp):
         """
@@ -39,118 +284,204 @@ class TweetScrapper:
         ----------
         scrapped_df : pandas.DataFrame
 
-        In the below link you may find the reference for got.manager.TweetCriteria:
-        https://pypi.org/project/GetOldTweets3/
-        """
-        scrapped_df = pd.DataFrame(
-            columns=[
-                'Company',
-                'Industry',
-                'Id',
-                'Tweet',
-                'Year',
-                'Month',
-                'Date',
-                'No. Of Retweets',
-                'No. Of Favorites',
-                'Influence Score',
-                'Label'])
-        for i in range(2):
-            tweetCriteria = None
-            if i % 2 == 1:
-                print("location")
-                tweetCriteria = got.manager.TweetCriteria().setQuerySearch(
-                    comp.company) .setSince(
-                    comp.start_date) .setUntil(
-                    comp.end_date) .setNear("Fagaras") .setWithin(
-                    "230" +
-                    str(i) +
-                    "mi") .setMaxTweets(
-                    self.no_of_tweets -
-                    i)
-            else:
-                print("no location")
-                tweetCriteria = got.manager.TweetCriteria().setQuerySearch(
-                    comp.company) .setSince(
-                    comp.start_date) .setUntil(
-                    comp.end_date) .setMaxTweets(
-                    self.no_of_tweets -
-                    i)
-
-            """
-            Fagaras was chosen as the point of reference because
-            the city is located in the geographical center of Romania.
-            Also, 250 miles(around 400 kilometers) is enough in order to cover the whole country.
-            """
-            tweets = None
-            while True:
-                try:
-                    tweets = got.manager.TweetManager.getTweets(tweetCriteria)
-                    if tweets is not None:
-                        break
-                except Exception as e:
-                    print("Please wait a little")
-                    sleep(1)
+        The tweets are requested from self.source, which is Twitter (through GetOldTweets3) unless
+        another TweetSource was given to the scrapper.
+        """
+        plan = self.plan_queries(comp)
+        tweets_lists = self.engine.run(self.get_fetching_tasks(comp, plan))
+        return self.build_company_dataframe(comp, tweets_lists, plan)
+
+    def build_company_dataframe(self, comp, tweets_lists, plan):
+        """
+        Filters the tweets returned by the queries made for a company and stores the relevant ones in a dataframe
+        Parameters
+        ----------
+        comp: Company object
+        tweets_lists : list
+            the list contains, for each query, the list of tweets it returned
+        plan : tuple
+            the plan of the queries, as returned by plan_queries
+
+        Returns
+        ----------
+        scrapped_df : pandas.DataFrame
+        """
+        return self.accumulate_company_tweets(
+            comp, tweets_lists, plan).to_dataframe()
+
+    def accumulate_company_tweets(self, comp, tweets_lists, plan, matcher=None):
+        """
+        Parameters
+        ----------
+        comp: Company object
+        tweets_lists : list
+            the list contains, for each query, the list of tweets it returned
+        plan : tuple
+            the plan of the queries, as returned by plan_queries
+        matcher : CompanyMatcher or None
+            see iter_company_tweets
+
+        Returns
+        ----------
+        accumulator : TweetAccumulator
+            stores the relevant tweets about the company
+        """
+        accumulator = TweetAccumulator()
+        for ith_tweet in self.iter_company_tweets(comp, tweets_lists, plan, matcher):
+            accumulator.append(ith_tweet)
+        print(len(accumulator))
+        return accumulator
+
+    def iter_company_tweets(self, comp, tweets_lists, plan, matcher=None):
+        """
+        Generator that filters the tweets returned by the queries made for a company as they arrive
+        Parameters
+        ----------
+        comp: Company object
+        tweets_lists : iterable
+            yields, for each query, the list of tweets it returned (or None if the request failed)
+        plan : tuple
+            the plan of the queries, as returned by plan_queries
+        matcher : CompanyMatcher or None
+            when given, comp is the shared stream of an industry and every tweet is yielded once
+            for each of the companies found in it by the matcher
+
+        Returns
+        ----------
+        ith_tweet : list
+            the values of a relevant tweet, in the order given by TWEET_COLUMNS; the tweets about the company
+            that are already archived for the analysing period are yielded first
+        """
+        deduplicator = self.get_deduplicator(comp)
+        # Every tweet that went through the language filter is archived,
+        # together with the decision taken for it
+        archived_rows = []
+        if self.archive is not None:
+            deduplicator.add_known_ids(self.archive.get_ids(comp.company))
+            archived = self.archive.load_tweets(comp)
+            for j in range(len(archived)):
+                ith_tweet = [archived.column(column)[j] for column in TWEET_COLUMNS]
+                if matcher is None:
+                    yield ith_tweet
                     continue
+                for company in matcher.match(ith_tweet[TWEET_COLUMNS.index('Tweet')]):
+                    yield [company] + ith_tweet[1:]
+        received_lists = []
+        for tweets in tweets_lists:
+            received_lists.append(tweets)
+            # The failed requests did not return anything
+            if tweets is None:
+                continue
+            # The cheap filters are applied first, then the language of the
+            # remaining tweets of the request is identified at once
+            candidates = []
             for tweet in tweets:
-                text = tweet.text
                 try:
+                    text = tweet.text
+                    # The same tweet is usually returned by both queries, so
+                    # it is processed only the first time it is seen
+                    id = int(tweet.id)
+                    if deduplicator.is_duplicate(id, text):
+                        continue
                     # The tweets starting with 'I'm at" are just tweets where
                     # people tag themselves in a location and do not convey any
                     # message, so they are eliminated
                     common_twitter_string = "I'm at"
-                    language = detect(text)
-                    if language == "ro" and common_twitter_string not in text[:10]:
-                        should_be_added = True
-                        if (comp.company in text) == False:
-                            continue
-                        id = tweet.id
-                        if text in scrapped_df['Tweet']:
-                            for j in range(len(scrapped_df)):
-                                if text == scrapped_df.iloc[j]['Tweet']:
-                                    if scrapped_df.iloc[j]['Id'] != id:
-                                        should_be_added
-                                    else:
-                                        should_be_added = False
-                                        break
-                        if not should_be_added:
-                            continue
-
-                        retweets = tweet.retweets
-                        favorites = tweet.favorites
-                        influence_score = 3 * (retweets + 1) + (favorites + 1)
-                        year = tweet.date.year
-                        date = ""
-                        month = ""
-                        if tweet.date.month < 10:
-                            date = str(tweet.date.year) + "-0" + \
-                                str(tweet.date.month) + "-" + str(tweet.date.day)
-                        else:
-                            date = str(tweet.date.year) + "-" + \
-                                str(tweet.date.month) + "-" + str(tweet.date.day)
-                        if tweet.date.month < 10:
-                            month = str(tweet.date.year) + "-0" + \
-                                str(tweet.date.month)
-                        else:
-                            month = str(tweet.date.year) + "-" + \
-                                str(tweet.date.month)
-                        ith_tweet = [
-                            comp.company,
-                            comp.industry,
-                            id,
-                            text,
-                            year,
-                            month,
-                            date,
-                            retweets,
-                            favorites,
-                            influence_score,
-                            '#']
-                        scrapped_df.loc[len(scrapped_df)] = ith_tweet
+                    if matcher is not None:
+                        companies = matcher.match(text)
+                    elif comp.company in text:
+                        companies = [comp.company]
+                    else:
+                        companies = []
+                    passed = common_twitter_string not in text[:10] and len(companies) > 0
+                    candidates.append((tweet, id, passed, companies))
                 except Exception as e:
                     continue
-        print(len(scrapped_df))
-        return scrapped_df
+            languages = iter(self.language_identifier.identify_batch(
+                [tweet.text for tweet, id, passed, companies in candidates if passed]))
+            for tweet, id, passed, companies in candidates:
+                text = tweet.text
+                ith_tweet = None
+                try:
+                    language = next(languages) if passed else None
+                    kept = passed and language == "ro"
+
+                    retweets = tweet.retweets
+                    favorites = tweet.favorites
+                    influence_score = 3 * (retweets + 1) + (favorites + 1)
+                    year = tweet.date.year
+                    date = ""
+                    month = ""
+                    if tweet.date.month < 10:
+                        date = str(tweet.date.year) + "-0" + \
+                            str(tweet.date.month) + "-" + str(tweet.date.day)
+                    else:
+                        date = str(tweet.date.year) + "-" + \
+                            str(tweet.date.month) + "-" + str(tweet.date.day)
+                    if tweet.date.month < 10:
+                        month = str(tweet.date.year) + "-0" + \
+                            str(tweet.date.month)
+                    else:
+                        month = str(tweet.date.year) + "-" + \
+                            str(tweet.date.month)
+                    archived_rows.append((month, tweet.date.strftime("%Y-%m-%d"), id, text, year, date,
+                                          retweets, favorites, influence_score, language, int(kept)))
+                    if not kept:
+                        continue
+                    ith_tweet = [
+                        None,
+                        comp.industry,
+                        id,
+                        text,
+                        year,
+                        month,
+                        date,
+                        retweets,
+                        favorites,
+                        influence_score,
+                        '#']
+                    deduplicator.mark_as_kept(id)
+                except Exception as e:
+                    continue
+                for company in companies:
+                    yield [company] + ith_tweet[1:]
+        if deduplicator.seen_store is not None:
+            deduplicator.seen_store.save()
+        if self.archive is not None:
+            ranges, queries = plan
+            self.archive.store_tweets(comp.company, archived_rows)
+            complete_ranges = list(ranges)
+            for j in range(len(queries)):
+                i, since, until, max_tweets = queries[j]
+                if received_lists[j] is None or len(received_lists[j]) >= max_tweets:
+                    # The period of a failed request, or of a request cut
+                    # short by its budget, is not covered and is requested
+                    # again next time, the tweets already archived being
+                    # served instead
+                    complete_ranges = [(range_since, range_until) for range_since, range_until in complete_ranges
+                                       if range_until <= since or range_since >= until]
+                    continue
+                self.watermark_store.update_watermark(
+                    comp.company, i, since, until, received_lists[j])
+            self.archive.mark_complete_months(
+                comp.company, self.get_complete_months(comp, complete_ranges))
+
+    def iter_tweets(self, comp):
+        """
+        Generator that yields the relevant tweets about a company while the queries are still running
+
+        Parameters
+        ----------
+        comp: Company object
+
+        Returns
+        ----------
+        ith_tweet : list
+            the values of a relevant tweet, in the order given by TWEET_COLUMNS
+        """
+        plan = self.plan_queries(comp)
+        tweets_lists = self.engine.iter_run(self.get_fetching_tasks(comp, plan))
+        return self.iter_company_tweets(comp, tweets_lists, plan)
 
     def scrap_for_tweets_in_a_industry(self, ind):
         """
@@ -163,30 +494,62 @@ class TweetScrapper:
         ----------
         industry_df : pandas.DataFrame
         """
-        industry_df = pd.DataFrame(
-            columns=[
-                'Company',
-                'Industry',
-                'Id',
-                'Tweet',
-                'Year',
-                'Date',
-                'No. Of Retweets',
-                'No. Of Favorites',
-                'Influence Score',
-                'Label'])
-        # Iterating over the list of companies
-        for company in ind.list_of_companies:
-            # Creating the Company object
-            comp = Company(company, ind.industry, ind.start_date, ind.end_date)
-
-            # Scrapping tweets where the company previously created is
-            # mentioned
-            company_df = self.scrap_for_tweets(comp)
-
-            # Concatenating the dataframes
-            frames = [industry_df, company_df]
-            result = pd.concat(frames)
-            industry_df = result
+        if self.shared_industry_stream:
+            return self.scrap_industry_stream(ind)
+        industry_accumulator = TweetAccumulator()
+        companies = [
+            Company(
+                company,
+                ind.industry,
+                ind.start_date,
+                ind.end_date) for company in ind.list_of_companies]
+
+        # Sending the queries for all the companies at the same time
+        tasks = []
+        plans = []
+        for comp in companies:
+            plans.append(self.plan_queries(comp))
+            tasks.extend(self.get_fetching_tasks(comp, plans[-1]))
+        results = self.engine.run(tasks)
+
+        # Iterating over the list of companies, in the order of the industry
+        position = 0
+        for i in range(len(companies)):
+            no_of_queries = len(plans[i][1])
+            tweets_lists = results[position:position + no_of_queries]
+            position += no_of_queries
+            industry_accumulator.extend(
+                self.accumulate_company_tweets(companies[i], tweets_lists, plans[i]))
 
+        # Building the dataframe only once, after all the companies were
+        # processed
+        industry_df = industry_accumulator.to_dataframe()
         return industry_df
+
+    def scrap_industry_stream(self, ind):
+        """
+        Requests the tweets about all the companies of an industry with a single query stream, so that a tweet
+        mentioning several companies is downloaded only once, and attributes every tweet locally to all the
+        companies mentioned in it
+        Parameters
+        ----------
+        ind : Industry object
+
+        Returns
+        ----------
+        industry_df : pandas.DataFrame
+        """
+        matcher = CompanyMatcher(ind.list_of_companies)
+        # The stream is archived under its own name, separately from the
+        # tweets scrapped for every company
+        stream = Company(
+            "industry-" + ind.industry,
+            ind.industry,
+            ind.start_date,
+            ind.end_date)
+        plan = self.plan_queries(
+            stream, self.no_of_tweets * len(ind.list_of_companies))
+        tweets_lists = self.engine.run(
+            self.get_fetching_tasks(stream, plan, matcher.get_query()))
+        return self.accumulate_company_tweets(
+            stream, tweets_lists, plan, matcher).to_dataframe()
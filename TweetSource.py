@@ -0,0 +1,187 @@
+import os
+import ast
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import GetOldTweets3 as got
+import pandas as pd
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class TweetQuery:
+    def __init__(
+            self,
+            query_search,
+            since,
+            until,
+            max_tweets,
+            near=None,
+            within=None):
+        """
+        Class that describes a request for tweets, independently of the source that serves it
+        Parameters
+        ----------
+        query_search : string
+            the text that should be contained by the tweets
+        since : string
+            the first day of the period, has the format "YYYY-MM-DD"
+        until : string
+            the day until which tweets are requested, has the format "YYYY-MM-DD"
+        max_tweets : int
+            maximum number of tweets returned
+        near : string or None
+            the place around which the tweets were posted
+        within : string or None
+            the radius around the place, for example "250mi"
+        """
+        self.query_search = query_search
+        self.since = since
+        self.until = until
+        self.max_tweets = max_tweets
+        self.near = near
+        self.within = within
+
+
+class ReplayTweet:
+    def __init__(self, id, text, date, retweets, favorites):
+        """
+        Class with the same fields the scrapper reads from the tweets returned by GetOldTweets3
+        """
+        self.id = id
+        self.text = text
+        self.date = date
+        self.retweets = retweets
+        self.favorites = favorites
+
+
+class TweetSource(ABC):
+    def __init__(self, name):
+        """
+        Base class of the sources from which the scrapper gets its tweets
+        Parameters
+        ----------
+        name : string
+            the name of the source, used for its rate limit
+        """
+        self.name = name
+
+    @abstractmethod
+    def get_tweets(self, query):
+        """
+        Parameters
+        ----------
+        query : TweetQuery
+
+        Returns
+        ----------
+        tweets : list
+            the list contains objects with the fields id, text, date, retweets and favorites
+        """
+
+
+class GetOldTweetsSource(TweetSource):
+    def __init__(self):
+        """
+        Source that searches the tweets on Twitter with GetOldTweets3
+        """
+        super().__init__("GetOldTweets3")
+
+    def get_tweets(self, query):
+        """
+        In the below link you may find the reference for got.manager.TweetCriteria:
+        https://pypi.org/project/GetOldTweets3/
+        """
+        tweetCriteria = got.manager.TweetCriteria().setQuerySearch(
+            query.query_search) .setSince(
+            query.since) .setUntil(
+            query.until) .setMaxTweets(
+            query.max_tweets)
+        if query.near is not None:
+            tweetCriteria = tweetCriteria.setNear(
+                query.near).setWithin(query.within)
+        return got.manager.TweetManager.getTweets(tweetCriteria)
+
+
+class ReplayTweetSource(TweetSource):
+    def __init__(self, paths, latency=0.0):
+        """
+        Source that serves the tweets stored in local files, used for running the analyses without access to Twitter
+        Parameters
+        ----------
+        paths : list
+            paths of .csv files with the columns written by the scrapper ('Id', 'Tweet', 'Date',
+            'No. Of Retweets', 'No. Of Favorites') or of .jsonl files with the keys
+            'id', 'text', 'date', 'retweets' and 'favorites'
+        latency : float
+            number of seconds every request waits before returning, to imitate the network
+        """
+        super().__init__("Replay")
+        self.latency = latency
+        self.tweets = []
+        for path in paths:
+            if os.path.splitext(path)[1] == ".jsonl":
+                self.tweets.extend(self.read_jsonl(path))
+            else:
+                self.tweets.extend(self.read_csv(path))
+        # Like Twitter, the newest tweets are returned first
+        self.tweets.sort(key=lambda tweet: (tweet.date, tweet.id), reverse=True)
+
+    def parse_date(self, text):
+        year, month, day = text[:10].split("-")
+        return datetime(int(year), int(month), int(day))
+
+    def read_csv(self, path):
+        tweets = []
+        df = pd.read_csv(path)
+        for i in range(len(df)):
+            text = df.iloc[i]['Tweet']
+            # The processed dataframes store the list of tokens of the tweet,
+            # from which the name of the company was removed
+            if text.startswith("["):
+                text = df.iloc[i]['Company'] + " " + \
+                    " ".join(ast.literal_eval(text))
+            tweets.append(ReplayTweet(
+                int(df.iloc[i]['Id']),
+                text,
+                self.parse_date(df.iloc[i]['Date']),
+                int(df.iloc[i]['No. Of Retweets']),
+                int(df.iloc[i]['No. Of Favorites'])))
+        return tweets
+
+    def read_jsonl(self, path):
+        tweets = []
+        with open(path, encoding='utf-8', mode="r") as f:
+            for line in f:
+                if line.strip() == "":
+                    continue
+                row = json.loads(line)
+                tweets.append(ReplayTweet(
+                    int(row['id']),
+                    row['text'],
+                    self.parse_date(row['date']),
+                    int(row.get('retweets', 0)),
+                    int(row.get('favorites', 0))))
+        return tweets
+
+    def get_tweets(self, query):
+        """
+        Returns the stored tweets from the period of the query that contain its text, ignoring the case;
+        the location of the query is ignored and, like on Twitter, the terms of a query of the form
+        '"term" OR "term"' are searched separately
+        """
+        if self.latency > 0:
+            time.sleep(self.latency)
+        since = self.parse_date(query.since)
+        until = self.parse_date(query.until)
+        terms = [term.strip().strip('"').lower() for term in query.query_search.split(" OR ")]
+        tweets = []
+        for tweet in self.tweets:
+            if len(tweets) >= query.max_tweets:
+                break
+            if since <= tweet.date < until and any(term in tweet.text.lower() for term in terms):
+                tweets.append(tweet)
+        return tweets
@@ -1,5 +1,5 @@
 import squarify
-from TweetPreprocessor import TweetPreprocessor
+from LexiconRegistry import SHARED_LEXICON_REGISTRY
 from matplotlib import pyplot as plt
 from nltk.corpus import stopwords
 from wordcloud import WordCloud
@@ -406,9 +406,8 @@ class Visualizer:
 
         # Building a custom "aggresive" stop-words list in order to prevent
         # these words from appearing in the wordcloud
-        tp = TweetPreprocessor()
-        custom_stop_words = tp.read_list_of_stop_words()
-        companies_list = tp.read_list_of_companies()
+        custom_stop_words = SHARED_LEXICON_REGISTRY.get('stop_words')
+        companies_list = SHARED_LEXICON_REGISTRY.get('companies')
         final_sws = np.concatenate(
             (custom_stop_words, companies_list, self.stop_words_nltk), axis=0)
 
@@ -0,0 +1,84 @@
+import os
+import json
+import datetime
+import threading
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class WatermarkStore:
+    def __init__(self, directory):
+        """
+        Class that keeps, for every company and query variant, the newest tweet that was already scrapped,
+        so that the next scrapping only asks for the newer tweets
+        Parameters
+        ----------
+        directory : string
+            the directory where the watermarks are saved
+        """
+        self.directory = directory
+        self.watermarks_path = os.path.join(directory, "watermarks.json")
+        self.lock = threading.Lock()
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        if os.path.exists(self.watermarks_path):
+            with open(self.watermarks_path, "r") as f:
+                self.watermarks = json.load(f)
+        else:
+            self.watermarks = {}
+
+    def get_key(self, company, variant):
+        return company + "|" + str(variant)
+
+    def get_watermark(self, company, variant):
+        """
+        Parameters
+        ----------
+        company : string
+        variant : int
+            0 for the query without location, 1 for the query restricted to Romania
+
+        Returns
+        ----------
+        watermark : dict or None
+            {'since': first day covered, 'until': day until which the tweets were requested, at most the day
+            on which they were requested, 'date': day of the newest tweet, 'id': id of the newest tweet}
+        """
+        with self.lock:
+            return self.watermarks.get(self.get_key(company, variant))
+
+    def update_watermark(self, company, variant, since, until, tweets):
+        """
+        Moves the watermark of a (company, variant) pair after a query between since and until returned tweets
+        """
+        # The tweets of the days that had not ended when the query was sent
+        # are not covered by it
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        until = max(since, min(until, today))
+        newest = None
+        for tweet in tweets:
+            if newest is None or (tweet.date, int(tweet.id)) > (newest.date, int(newest.id)):
+                newest = tweet
+        with self.lock:
+            key = self.get_key(company, variant)
+            watermark = self.watermarks.get(key)
+            contiguous = watermark is not None and since <= watermark.get(
+                'until', watermark['date']) and until >= watermark['since']
+            if watermark is not None and not contiguous and until < watermark['since']:
+                # An older period that is not joined to the covered one
+                # does not move the watermark
+                return
+            if not contiguous:
+                watermark = {'since': since, 'until': until, 'date': since, 'id': 0}
+            else:
+                watermark['since'] = min(watermark['since'], since)
+                watermark['until'] = max(watermark.get('until', watermark['date']), until)
+            if newest is not None:
+                newest_date = newest.date.strftime("%Y-%m-%d")
+                if (newest_date, int(newest.id)) > (watermark['date'], watermark['id']):
+                    watermark['date'] = newest_date
+                    watermark['id'] = int(newest.id)
+            self.watermarks[key] = watermark
+            with open(self.watermarks_path, "w") as f:
+                json.dump(self.watermarks, f, indent=4)
@@ -0,0 +1,122 @@
+from array import array
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+class WordTrie:
+    def __init__(self, words=(), arrays=None):
+        """
+        Trie stored in flat integer arrays, the edges leaving a node being consecutive and sorted by their letter
+        Parameters
+        ----------
+        words : iterable
+            the words stored in the trie
+        arrays : tuple or None
+            (first_edge, edge_count, terminal, labels, targets), the arrays of an already built trie,
+            as returned by get_arrays; when given, words is ignored
+        """
+        if arrays is None:
+            arrays = self.build(words)
+        self.first_edge, self.edge_count, self.terminal, self.labels, self.targets = arrays
+
+    def build(self, words):
+        children = [{}]
+        is_word = [False]
+        for word in words:
+            node = 0
+            for character in word:
+                if character not in children[node]:
+                    children.append({})
+                    is_word.append(False)
+                    children[node][character] = len(children) - 1
+                node = children[node][character]
+            is_word[node] = True
+
+        # The nodes are renumbered in breadth-first order, so that the root
+        # is 0 and every node is numbered before its children
+        order = [0]
+        for node in order:
+            for character in sorted(children[node]):
+                order.append(children[node][character])
+        number = [0] * len(order)
+        for i in range(len(order)):
+            number[order[i]] = i
+
+        first_edge = array('i')
+        edge_count = array('i')
+        terminal = array('b')
+        labels = array('i')
+        targets = array('i')
+        for node in order:
+            first_edge.append(len(labels))
+            edge_count.append(len(children[node]))
+            terminal.append(int(is_word[node]))
+            for character in sorted(children[node]):
+                labels.append(ord(character))
+                targets.append(number[children[node][character]])
+        return first_edge, edge_count, terminal, labels, targets
+
+    def get_arrays(self):
+        return self.first_edge, self.edge_count, self.terminal, self.labels, self.targets
+
+    def get_child(self, node, character):
+        """
+        Returns the node reached from node through the edge labeled with character, or -1 if there is no such edge
+        """
+        label = ord(character)
+        low = self.first_edge[node]
+        high = low + self.edge_count[node]
+        while low < high:
+            middle = (low + high) // 2
+            if self.labels[middle] < label:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.first_edge[node] + self.edge_count[node] and self.labels[low] == label:
+            return self.targets[low]
+        return -1
+
+    def __contains__(self, word):
+        node = 0
+        for character in word:
+            node = self.get_child(node, character)
+            if node == -1:
+                return False
+        return self.terminal[node] == 1
+
+    def find_reduction(self, runs):
+        """
+        Parameters
+        ----------
+        runs : list
+            the run-length encoding of a word, as tuples (letter, number of repetitions)
+
+        Returns
+        ----------
+        removals : tuple or None
+            the number of letters removed from every run so that the word is in the trie, None if there
+            is no such reduction; the reduction with the fewest removals is chosen and, among them, the one
+            that removes more letters from the first runs
+        """
+        best = None
+        # Every node is reached through a single prefix, so the search
+        # visits every node of the trie at most once
+        stack = [(0, 0, ())]
+        while len(stack) > 0:
+            node, run, removals = stack.pop()
+            if run == len(runs):
+                if self.terminal[node] == 1:
+                    key = (sum(removals), tuple(-removed for removed in removals))
+                    if best is None or key < best[0]:
+                        best = (key, removals)
+                continue
+            character, length = runs[run]
+            for kept in range(1, length + 1):
+                node = self.get_child(node, character)
+                if node == -1:
+                    break
+                stack.append((node, run + 1, removals + (length - kept,)))
+        if best is None:
+            return None
+        return best[1]
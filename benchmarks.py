@@ -0,0 +1,400 @@
+import os
+import sys
+import time
+import random
+import threading
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from TweetAccumulator import TweetAccumulator, TWEET_COLUMNS
+from TweetSource import ReplayTweetSource
+from TweetScrapper import TweetScrapper
+from Industry import Industry
+from TweetPreprocessor import TweetPreprocessor
+from LexiconRegistry import LexiconRegistry, get_data_path
+from LexiconBundle import write_bundle
+from Model import Model, get_quantized_path, quantize_model
+from ModelRegistry import ModelRegistry, MODEL_NAME, MODEL_PATH, get_resident_memory
+from PredictionCache import PredictionCache
+from InferenceService import InferenceService, InferenceClient
+from EReputationCalculator import EReputationCalculator
+from Company import Company
+
+import warnings
+warnings.filterwarnings("ignore")
+
+
+def get_sample_tweet(i):
+    return [
+        'eMAG',
+        'Consumer goods',
+        str(1300000000000000000 + i),
+        'Reduceri la eMAG azi ' + str(i),
+        2020,
+        '2020-08',
+        '2020-08-31',
+        i % 7,
+        i % 11,
+        3 * (i % 7 + 1) + (i % 11 + 1),
+        '#']
+
+
+def benchmark_accumulator(sizes=(100, 1000, 5000)):
+    """
+    Compares the cost of appending a tweet with DataFrame.loc[len(df)] and with the TweetAccumulator,
+    for a growing number of tweets
+    """
+    print("tweets | DataFrame.loc (us/tweet) | TweetAccumulator (us/tweet)")
+    for size in sizes:
+        tweets = [get_sample_tweet(i) for i in range(size)]
+
+        start = time.perf_counter()
+        df = pd.DataFrame(columns=TWEET_COLUMNS)
+        for ith_tweet in tweets:
+            df.loc[len(df)] = ith_tweet
+        loc_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        accumulator = TweetAccumulator()
+        for ith_tweet in tweets:
+            accumulator.append(ith_tweet)
+        accumulator.to_dataframe()
+        accumulator_time = time.perf_counter() - start
+
+        print("%6d | %24.2f | %27.2f" % (
+            size, loc_time / size * 1e6, accumulator_time / size * 1e6))
+
+
+SAMPLE_CORPORA = [
+    "Scrapped dataframes/Companies/eMAG_comp_216_processed.csv",
+    "Scrapped dataframes/Industries/Transportation_comp_80_processed.csv"]
+
+
+def benchmark_replay_scrapping(latency=0.2):
+    """
+    Scraps an industry from the sample corpora through a ReplayTweetSource that imitates the network latency
+    """
+    source = ReplayTweetSource(SAMPLE_CORPORA, latency=latency)
+    ind = Industry("Transportation", "2020-01-01", "2020-09-30")
+    for max_workers in [1, 8]:
+        scrapper = TweetScrapper(1000, max_workers=max_workers, source=source)
+        start = time.perf_counter()
+        df = scrapper.scrap_for_tweets_in_a_industry(ind)
+        print("max_workers=%d: %d tweets in %.2f s" % (
+            max_workers, len(df), time.perf_counter() - start))
+
+
+def get_corpus_texts():
+    return [tweet.text for tweet in ReplayTweetSource(SAMPLE_CORPORA).tweets]
+
+
+def benchmark_lexicon_index():
+    """
+    Preprocesses the sample corpora scanning the lexicons for every token and with the LexiconIndex,
+    checking that both give the same tokens
+    """
+    texts = get_corpus_texts()
+    results = {}
+    for use_lexicon_index in [False, True]:
+        preprocessor = TweetPreprocessor(use_lexicon_index=use_lexicon_index)
+        start = time.perf_counter()
+        results[use_lexicon_index] = [preprocessor.preprocess_tweet(text) for text in texts]
+        print("use_lexicon_index=%s: %d tweets in %.2f s" % (
+            use_lexicon_index, len(texts), time.perf_counter() - start))
+    print("same tokens: " + str(results[False] == results[True]))
+
+
+def benchmark_token_cache():
+    """
+    Preprocesses the sample corpora normalizing every token occurrence, and then in batch mode with a TokenNormalizer,
+    checking that both give the same tokens
+    """
+    texts = get_corpus_texts()
+    preprocessor = TweetPreprocessor(token_cache_size=None)
+    start = time.perf_counter()
+    expected = [preprocessor.preprocess_tweet(text) for text in texts]
+    print("without cache: %d tweets in %.2f s" % (len(texts), time.perf_counter() - start))
+
+    preprocessor = TweetPreprocessor()
+    start = time.perf_counter()
+    results = preprocessor.preprocess_tweets(texts)
+    print("batch mode: %d tweets in %.2f s" % (len(texts), time.perf_counter() - start))
+    start = time.perf_counter()
+    results_per_tweet = [preprocessor.preprocess_tweet(text) for text in texts]
+    print("per tweet, warm cache: %d tweets in %.2f s" % (len(texts), time.perf_counter() - start))
+    print("same tokens: " + str(expected == results and expected == results_per_tweet))
+    print(preprocessor.token_normalizer.get_stats())
+
+
+def benchmark_parallel_preprocessing(copies=8):
+    """
+    Preprocesses copies of the sample corpora with 1 process and with one process per core,
+    checking that the tweets keep their order
+    """
+    texts = get_corpus_texts() * copies
+    results = {}
+    for processes in sorted({1, os.cpu_count() or 1}):
+        # A new preprocessor for every run, so that no run starts with a warm cache
+        preprocessor = TweetPreprocessor(processes=processes)
+        df = pd.DataFrame({'Tweet': texts})
+        start = time.perf_counter()
+        results[processes] = list(preprocessor.preprocess_dataframe(df)['Tweet'])
+        print("processes=%d: %d tweets in %.2f s" % (
+            processes, len(texts), time.perf_counter() - start))
+    print("same tokens: " + str(all(result == results[1] for result in results.values())))
+
+
+def benchmark_lexicon_bundle(path="lexicons-benchmark.bundle"):
+    """
+    Compares the cold start of a preprocessor that reads the lexicons from their source files with the cold start
+    of one that reads them from a compiled bundle, checking that both give the same tokens
+    """
+    write_bundle(get_data_path(path), LexiconRegistry(bundle_path=None))
+    texts = get_corpus_texts()
+    results = {}
+    try:
+        for bundle_path in [None, path]:
+            start = time.perf_counter()
+            preprocessor = TweetPreprocessor(lexicon_registry=LexiconRegistry(bundle_path=bundle_path))
+            print("bundle_path=%s: preprocessor created in %.3f s" % (bundle_path, time.perf_counter() - start))
+            results[bundle_path] = preprocessor.preprocess_tweets(texts)
+    finally:
+        os.remove(get_data_path(path))
+    print("same tokens: " + str(results[None] == results[path]))
+
+
+SAMPLE_TWEETS = [
+    "Am comandat de la #eMAG https://t.co/ab12CD si a ajuns in 2 zile @eMAG_Romania multumesc!!!",
+    "www.metrorex.ro anunta ca statia 23 August e inchisa... #Metrorex #Bucuresti",
+    "@CFR_Calatori trenul IR1581 are 40 de minute intarziere, NuOSaCrezi :(( http1 h2ttp://x.ro",
+    "I cannot believe it, gonna buy it anyway #BlackFriday2020 @user123 ##",
+]
+
+
+def benchmark_tokenizer(repetitions=20):
+    """
+    Compares the per-tweet latency of the text cleaning and tokenization done with successive substitutions and
+    nltk.word_tokenize and with a single compiled regex, checking that both give the same tokens
+    """
+    texts = get_corpus_texts() + SAMPLE_TWEETS
+    results = {}
+    for tokenizer in ["nltk", "regex"]:
+        preprocessor = TweetPreprocessor(tokenizer=tokenizer, token_cache_size=None)
+        start = time.perf_counter()
+        for i in range(repetitions):
+            for text in texts:
+                preprocessor.tokenize(preprocessor.clean_text(text))
+        tokenization_time = (time.perf_counter() - start) / (repetitions * len(texts))
+        start = time.perf_counter()
+        results[tokenizer] = [preprocessor.preprocess_tweet(text) for text in texts]
+        preprocessing_time = (time.perf_counter() - start) / len(texts)
+        print("tokenizer=%s: cleaning and tokenization %.1f us/tweet, whole preprocessing %.1f us/tweet" % (
+            tokenizer, tokenization_time * 1e6, preprocessing_time * 1e6))
+    print("same tokens: " + str(results["nltk"] == results["regex"]))
+
+
+def benchmark_batch_prediction(model_path=MODEL_PATH, copies=20):
+    """
+    Compares the number of tweets labeled per second when the model is called for every tweet and when
+    it is called once for all of them, checking that both give the same labels, and times the e-reputation
+    of a whole dataframe
+    """
+    model = ModelRegistry().get(MODEL_NAME, model_path)
+    texts = [' '.join(tokens) for tokens in TweetPreprocessor().preprocess_tweets(get_corpus_texts())] * copies
+
+    start = time.perf_counter()
+    single_results = [model.predict(text) for text in texts]
+    single_time = time.perf_counter() - start
+    start = time.perf_counter()
+    labels, probabilities = model.predict_batch(texts)
+    batch_time = time.perf_counter() - start
+    print("predict: %.0f tweets/s, predict_batch: %.0f tweets/s" % (
+        len(texts) / single_time, len(texts) / batch_time))
+    print("same labels: " + str(all(
+        label == labels[i, 0] and abs(probability - probabilities[i, 0]) < 1e-6
+        for i, (label, probability) in enumerate(single_results))))
+
+    df = pd.DataFrame({
+        'Company': 'eMAG',
+        'Tweet': [text.split() for text in texts],
+        'Month': '2020-08',
+        'Influence Score': [i % 10 + 1 for i in range(len(texts))],
+        'Label': 0})
+    start = time.perf_counter()
+    EReputationCalculator().get_e_reputation(
+        Company('eMAG', 'Consumer goods', '2020-08-01', '2020-08-31'), model, df, ['2020-08'])
+    print("get_e_reputation: %.0f tweets/s" % (len(texts) / (time.perf_counter() - start)))
+
+
+def benchmark_prediction_cache(model_path=MODEL_PATH, path="prediction-cache-benchmark.db"):
+    """
+    Labels the preprocessed sample corpora with the model and through a PredictionCache, first with an empty cache
+    and then with a new cache that only has the predictions kept on disk, checking that all give the same labels
+    """
+    model = ModelRegistry().get(MODEL_NAME, model_path)
+    texts = [' '.join(tokens) for tokens in TweetPreprocessor().preprocess_tweets(get_corpus_texts())]
+    start = time.perf_counter()
+    expected = model.predict_batch(texts)
+    print("model: %d tweets in %.4f s" % (len(texts), time.perf_counter() - start))
+    try:
+        for run in ["empty cache", "disk tier only"]:
+            prediction_cache = PredictionCache(model, path=path)
+            start = time.perf_counter()
+            results = prediction_cache.predict_batch(texts)
+            print("%s: %d tweets in %.4f s, same labels: %s" % (
+                run, len(texts), time.perf_counter() - start,
+                (results[0] == expected[0]).all() and (results[1] == expected[1]).all()))
+            print(prediction_cache.get_stats())
+    finally:
+        os.remove(path)
+
+
+def measure_model(model_path, quantized, texts):
+    """
+    Loads the model and labels the texts, returning the loading time, the memory taken by the model, the number
+    of texts labeled per second and the labels
+    """
+    memory_before = get_resident_memory()
+    start = time.perf_counter()
+    model = Model(MODEL_NAME, model_path, quantized)
+    load_time = time.perf_counter() - start
+    memory = get_resident_memory() - memory_before
+    start = time.perf_counter()
+    labels, probabilities = model.predict_batch(texts)
+    throughput = len(texts) / (time.perf_counter() - start)
+    return load_time, memory, throughput, list(labels[:, 0])
+
+
+def benchmark_quantized_model(model_path=MODEL_PATH, copies=20):
+    """
+    Compares the full precision model with its quantized version on the preprocessed sample corpora: the loading
+    time, the memory, the number of tweets labeled per second and the share of tweets that get the same label;
+    the quantized model is built first if it does not exist
+    """
+    if not os.path.exists(get_quantized_path(model_path)):
+        print("Quantized model saved at " + quantize_model(model_path))
+    texts = [' '.join(tokens) for tokens in TweetPreprocessor().preprocess_tweets(get_corpus_texts())] * copies
+    results = {}
+    # Every model is measured in a new process, so that the memory of one
+    # model is not counted for the other
+    context = multiprocessing.get_context("spawn")
+    for quantized in [False, True]:
+        with context.Pool(1) as pool:
+            results[quantized] = pool.apply(measure_model, (model_path, quantized, texts))
+        load_time, memory, throughput, labels = results[quantized]
+        print("quantized=%s: loaded in %.3f s, %.1f MB, %.0f tweets/s" % (
+            quantized, load_time, memory / 2 ** 20, throughput))
+    agreement = np.mean(np.array(results[False][3]) == np.array(results[True][3]))
+    print("same labels: %.2f%% of the tweets" % (agreement * 100))
+
+
+def send_concurrent_requests(model, texts, clients):
+    """
+    Labels the texts one at a time from several threads, each thread labeling a share of them, and returns
+    the number of seconds it took and the labels
+    """
+    labels = [None] * len(texts)
+
+    def send_requests(first):
+        for i in range(first, len(texts), clients):
+            labels[i] = model.predict(texts[i])[0]
+
+    threads = [threading.Thread(target=send_requests, args=(first,)) for first in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, labels
+
+
+def benchmark_inference_service(model_path=MODEL_PATH, clients=8, copies=10):
+    """
+    Labels the preprocessed sample corpora one tweet per request from concurrent clients, with the model of
+    the process and through an InferenceService that groups the requests in micro-batches, checking that
+    both give the same labels
+    """
+    texts = [' '.join(tokens) for tokens in TweetPreprocessor().preprocess_tweets(get_corpus_texts())] * copies
+    elapsed, expected = send_concurrent_requests(
+        PredictionCache(ModelRegistry().get(MODEL_NAME, model_path), cache_size=0), texts, clients)
+    print("model of the process: %.0f tweets/s" % (len(texts) / elapsed))
+    # Without any cached prediction, every tweet is labeled by the model
+    service = InferenceService(
+        model_path=model_path, address=("localhost", 0), authkey=os.urandom(32), cache_size=0)
+    service.start()
+    try:
+        elapsed, labels = send_concurrent_requests(
+            InferenceClient(service.address, service.authkey), texts, clients)
+    finally:
+        service.stop()
+    print("InferenceService: %.0f tweets/s, %s" % (len(texts) / elapsed, service.get_stats()))
+    print("same labels: " + str(labels == expected))
+
+
+def get_noisy_words(preprocessor, size, max_repetitions=4):
+    """
+    Returns words with multiple vowels and random words in which some letters are repeated, as they are written in tweets
+    """
+    generator = random.Random(0)
+    words = sorted(preprocessor.multiple_vowel_words_set)
+    noisy_words = []
+    for i in range(size):
+        word = generator.choice(words) if i % 2 == 0 else ''.join(
+            [generator.choice('abcdeimnorstu') for j in range(generator.randint(3, 9))])
+        noisy_words.append(''.join([character * generator.randint(1, max_repetitions) for character in word]))
+    return noisy_words
+
+
+def benchmark_word_trie(size=2000):
+    """
+    Compares the elimination of the extra letters by trying every combination of removed letters and by walking
+    the trie of the words with multiple vowels, checking that both give the same words
+    """
+    preprocessors = {
+        False: TweetPreprocessor(use_word_trie=False),
+        True: TweetPreprocessor(use_word_trie=True)}
+    words = get_noisy_words(preprocessors[True], size)
+    results = {}
+    for use_word_trie in [False, True]:
+        start = time.perf_counter()
+        results[use_word_trie] = [preprocessors[use_word_trie].eliminate_extra_letters(word) for word in words]
+        print("use_word_trie=%s: %d words in %.2f s" % (
+            use_word_trie, len(words), time.perf_counter() - start))
+    print("same words: " + str(results[False] == results[True]))
+    # Every pair of vowels doubles the number of combinations tried
+    for pairs in [8, 12, 16]:
+        word = ("aaeeoouu" * pairs)[:2 * pairs]
+        for use_word_trie in [False, True]:
+            start = time.perf_counter()
+            preprocessors[use_word_trie].eliminate_extra_letters(word)
+            print("%d vowel pairs, use_word_trie=%s: %.4f s" % (
+                pairs, use_word_trie, time.perf_counter() - start))
+
+
+BENCHMARKS = {
+    'accumulator': benchmark_accumulator,
+    'replay': benchmark_replay_scrapping,
+    'lexicon': benchmark_lexicon_index,
+    'word_trie': benchmark_word_trie,
+    'token_cache': benchmark_token_cache,
+    'parallel': benchmark_parallel_preprocessing,
+    'bundle': benchmark_lexicon_bundle,
+    'tokenizer': benchmark_tokenizer,
+    'batch_prediction': benchmark_batch_prediction,
+    'prediction_cache': benchmark_prediction_cache,
+    'quantized_model': benchmark_quantized_model,
+    'inference_service': benchmark_inference_service,
+}
+
+
+def main():
+    names = sys.argv[1:] if len(sys.argv) > 1 else list(BENCHMARKS.keys())
+    for name in names:
+        print("Running the '" + name + "' benchmark")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
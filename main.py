@@ -7,10 +7,12 @@ from TweetPreprocessor import TweetPreprocessor
 from TweetScrapper import TweetScrapper
 from matplotlib import pyplot as plt
 from Visualizer import Visualizer
+from StreamingPipeline import StreamingPipeline
 from Industry import Industry
 from Company import Company
 from copy import deepcopy
-from Model import Model
+from ModelRegistry import SHARED_MODEL_REGISTRY
+from InferenceService import InferenceClient
 from PyPDF2 import PdfFileWriter, PdfFileReader
 
 import numpy as np
@@ -20,6 +22,29 @@ warnings.filterwarnings("ignore")
 
 
 NUMBER_OF_TWEETS = 100
+# The source of the tweets, None meaning Twitter; can be replaced with a
+# TweetSource.ReplayTweetSource in order to run the analyses offline
+TWEET_SOURCE = None
+# Number of processes used for preprocessing the tweets of an industry; with
+# more than 1, a pool of worker processes is started by the first analysis
+# and kept for the whole process
+PREPROCESSING_PROCESSES = 1
+# The tokens of the preprocessed tweets are kept here, so that the tweets
+# covered by several analyses are preprocessed only once
+PREPROCESSING_CACHE_PATH = "Scrapped dataframes/preprocessing_cache.db"
+# The labels predicted for the preprocessed tweets are kept in memory and
+# here, so that the tweets with the same tokens are labeled only once
+PREDICTION_CACHE_SIZE = 100000
+PREDICTION_CACHE_PATH = "Scrapped dataframes/prediction_cache.db"
+# If True, the quantized model built with "python Model.py <model path>" is
+# loaded in place of the full precision one, taking less memory per worker
+USE_QUANTIZED_MODEL = False
+# The address of the InferenceService started with "python InferenceService.py",
+# which labels the tweets of all the workers of the host with a single copy of
+# the model, the key of the service being read from the environment (see
+# InferenceService.get_authkey); if None, every worker loads its own model
+INFERENCE_SERVICE_ADDRESS = None
+INFERENCE_CLIENT = InferenceClient(INFERENCE_SERVICE_ADDRESS) if INFERENCE_SERVICE_ADDRESS is not None else None
 COMPANIES_COUNTER = 0
 INDUSTRIES_COUNTER = 0
 A4_PORTRAIT_MEASUREMENTS = (8.3, 11.7)
@@ -138,9 +163,20 @@ def plot_dispatcher(dict_form):
     1111
     1111
     """
-    model = Model('FastText', 'model_tweets-0.99-0.01-0.0.bin')
+    if INFERENCE_CLIENT is not None:
+        model = INFERENCE_CLIENT
+    else:
+        # The model is loaded only once for the whole process, and the
+        # predictions go through the cache placed in front of it
+        model = SHARED_MODEL_REGISTRY.get_prediction_cache(
+            quantized=USE_QUANTIZED_MODEL,
+            cache_size=PREDICTION_CACHE_SIZE,
+            cache_path=PREDICTION_CACHE_PATH)
     viz = Visualizer()
-    preprocessor = TweetPreprocessor(allow_stemming=True)
+    preprocessor = TweetPreprocessor(
+        allow_stemming=True,
+        processes=PREPROCESSING_PROCESSES,
+        cache_path=PREPROCESSING_CACHE_PATH)
     erep_calc = EReputationCalculator()
     bytes_image = None
     if "tweet-analysis" in dict_form.keys():
@@ -155,7 +191,7 @@ def plot_dispatcher(dict_form):
         if label == '__label__negative':
             return (-1) * confidence_score, 0, 0, 0
     elif "company" in dict_form.keys():
-        scrapper = TweetScrapper(1000)
+        scrapper = TweetScrapper(1000, source=TWEET_SOURCE)
         # Getting the options selected by the user
         company = dict_form['company']
         industry = dict_form['industry-name']
@@ -166,8 +202,10 @@ def plot_dispatcher(dict_form):
 
         my_dates = erep_calc.get_monthly_dates(comp)
 
-        # Performing the tweet scraping
-        df = scrapper.scrap_for_tweets(comp)
+        # Performing the tweet scraping, the preprocessing and the labeling
+        # at the same time, the tweets being processed as they are scrapped
+        pipeline = StreamingPipeline(scrapper, preprocessor, model, erep_calc)
+        df_raw, df, comp.multi_year_scores = pipeline.run(comp, my_dates)
 
         print(len(df))
         # If less than 30 tweets resulted than we don't have a representative
@@ -175,8 +213,6 @@ def plot_dispatcher(dict_form):
         if len(df) < 30:
             return -1, -1, -1, -1  # Not enough tweets
 
-        # Making a copy of the dataframe in its raw form
-        df_raw = deepcopy(df)
         # Saving the raw dataframe
         df_raw.to_csv("Scrapped dataframes/Companies/"+
             comp.company +
@@ -184,13 +220,6 @@ def plot_dispatcher(dict_form):
             str(COMPANIES_COUNTER) +
             "_raw.csv")
 
-        # Preprocessing stage
-        df = preprocessor.preprocess_dataframe(df)
-
-        # Determining the e-reputation scores
-        comp.multi_year_scores = erep_calc.get_e_reputation(
-            comp, model, df, my_dates)
-
         # Saving the dataframe after preprocessing and labeling
         df.to_csv("Scrapped dataframes/Companies/"+
             comp.company +
@@ -280,7 +309,7 @@ def plot_dispatcher(dict_form):
 
         return COMPANIES_COUNTER, bytes_image, len(df), comp.company
     elif "company-comparison-first" in dict_form.keys():
-        scrapper = TweetScrapper(1000)
+        scrapper = TweetScrapper(1000, source=TWEET_SOURCE)
         # Getting the options selected by the user
         first_company = dict_form['company-comparison-first']
         second_company = dict_form['company-comparison-second']
@@ -293,9 +322,13 @@ def plot_dispatcher(dict_form):
 
         my_dates = erep_calc.get_monthly_dates(first_comp)
 
-        # Performing the tweet scraping
-        df_1 = scrapper.scrap_for_tweets(first_comp)
-        df_2 = scrapper.scrap_for_tweets(second_comp)
+        # Performing the tweet scraping, the preprocessing and the labeling
+        # at the same time, the tweets being processed as they are scrapped
+        pipeline = StreamingPipeline(scrapper, preprocessor, model, erep_calc)
+        df_1_raw, df_1, first_comp.multi_year_scores = pipeline.run(
+            first_comp, my_dates)
+        df_2_raw, df_2, second_comp.multi_year_scores = pipeline.run(
+            second_comp, my_dates)
 
         # If less than 30 tweets resulted than we don't have a representative
         # enough amount of tweets in order to perform any analysis
@@ -303,27 +336,17 @@ def plot_dispatcher(dict_form):
             return -1, -1, -1, -1  # Not enough tweets
 
         # Saving the raw dataframes
-        df_1.to_csv("Scrapped dataframes/Companies/"+
+        df_1_raw.to_csv("Scrapped dataframes/Companies/"+
             first_comp.company +
             "_comp_" +
             str(COMPANIES_COUNTER) +
             "_raw.csv")
-        df_2.to_csv("Scrapped dataframes/Companies/"+
+        df_2_raw.to_csv("Scrapped dataframes/Companies/"+
             second_comp.company +
             "_comp_" +
             str(COMPANIES_COUNTER) +
             "_raw.csv")
 
-        # Preprocessing stage
-        df_1 = preprocessor.preprocess_dataframe(df_1)
-        df_2 = preprocessor.preprocess_dataframe(df_2)
-
-        # Determining the e-reputation scores
-        first_comp.multi_year_scores = erep_calc.get_e_reputation(
-            first_comp, model, df_1, my_dates)
-        second_comp.multi_year_scores = erep_calc.get_e_reputation(
-            second_comp, model, df_2, my_dates)
-
         # Saving the dataframe after preprocessing and labeling
         df_1.to_csv("Scrapped dataframes/Companies/"+
             first_comp.company +
@@ -457,7 +480,7 @@ def plot_dispatcher(dict_form):
         return COMPANIES_COUNTER, bytes_image, len(
             df_1) + len(df_2), first_comp.company + "-VS-" + second_comp.company
     elif "industry-name" in dict_form.keys():
-        scrapper = TweetScrapper(250)
+        scrapper = TweetScrapper(250, source=TWEET_SOURCE)
         # Getting the options selected by the user
         industry = dict_form['industry-name']
         start_date = dict_form['first_day']
@@ -0,0 +1,36 @@
+from LanguageIdentifier import LanguageIdentifier
+
+
+def test_romanian_texts_are_identified_without_langdetect():
+    language_identifier = LanguageIdentifier()
+    texts = [
+        "Livrarea a fost foarte rapidă",
+        "Sunt foarte multumit de comanda",
+        "Nu mai vreau nimic de la ei, chiar trebuie"]
+    for text in texts:
+        assert language_identifier.is_obviously_romanian(text)
+        assert language_identifier.identify(text) == 'ro'
+    assert language_identifier.get_stats()['detector_calls'] == 0
+
+
+def test_english_and_italian_texts_are_sent_to_langdetect():
+    language_identifier = LanguageIdentifier()
+    texts = {
+        'en': [
+            "take care of mine",
+            "I will take care of it, this one is mine",
+            "The din of the city has nothing to do with me"],
+        'it': ["Noi andiamo al mare, voi non venite mai", "Sa che la casa è mia o sua?"]}
+    for language, language_texts in texts.items():
+        for text in language_texts:
+            assert not language_identifier.is_obviously_romanian(text)
+            assert language_identifier.identify(text) == language
+    assert language_identifier.get_stats()['detector_calls'] == 5
+
+
+def test_turkish_texts_with_cedilla_are_sent_to_langdetect():
+    language_identifier = LanguageIdentifier()
+    text = "Yeni Dacia Logan aldım, teşekkürler herkese"
+    assert not language_identifier.is_obviously_romanian(text)
+    assert language_identifier.identify(text) == 'tr'
+    assert language_identifier.get_stats()['detector_calls'] == 1
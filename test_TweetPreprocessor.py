@@ -0,0 +1,18 @@
+import pytest
+from nltk.tokenize import word_tokenize
+
+from TweetPreprocessor import TweetPreprocessor
+from benchmarks import get_corpus_texts, SAMPLE_TWEETS
+
+
+def test_regex_tokenizer_gives_the_tokens_of_nltk():
+    try:
+        word_tokenize("Punkt")
+    except LookupError:
+        pytest.skip("the Punkt data of nltk is not installed")
+    texts = get_corpus_texts() + SAMPLE_TWEETS
+    nltk_preprocessor = TweetPreprocessor(tokenizer="nltk", token_cache_size=None)
+    regex_preprocessor = TweetPreprocessor(tokenizer="regex", token_cache_size=None)
+    for text in texts:
+        assert regex_preprocessor.clean_text(text) == nltk_preprocessor.clean_text(text)
+        assert regex_preprocessor.preprocess_tweet(text) == nltk_preprocessor.preprocess_tweet(text)